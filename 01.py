@@ -2,8 +2,12 @@ from __future__ import annotations
 
 import collections
 import io
+import itertools
+import operator
 
-from aoc2024_common import open_puzzle_input
+from array import array
+
+from aoc2024_common import iter_chunks, map_puzzle_input, timed
 
 TEST_VECTOR = """\
 3   4
@@ -41,6 +45,49 @@ def calculate_2(seq1, seq2):
     return sum(left * cs2[left] for left in seq1)
 
 
+def consume_columns(buf) -> tuple[array, array]:
+    """
+    Parse the (bytes-like) input into two int64 columns, a line-aligned chunk at a
+    time, without copying it whole
+    """
+    values = array("q")
+    for chunk in iter_chunks(buf):
+        # Copies one chunk at a time; split() is much faster than parse_ints() here
+        values.extend(map(int, bytes(chunk).split()))
+    if len(values) % 2:
+        raise ValueError("Input does not have two columns")
+    return values[0::2], values[1::2]
+
+
+def sort_bounded(seq) -> list[int]:
+    """
+    Sort seq, using a counting sort when the values are densely packed (value range at
+    most a quarter of the number of values): count each value, then sort only the
+    distinct values
+    """
+    if not seq:
+        return []
+    if 4 * (max(seq) - min(seq)) > len(seq):
+        return sorted(seq)
+    counts = collections.Counter(seq)
+    return list(
+        itertools.chain.from_iterable(
+            itertools.repeat(v, counts[v]) for v in sorted(counts)
+        )
+    )
+
+
+def calculate_1_fast(seq1, seq2) -> int:
+    # Everything below runs in C; no Python-level loop per row
+    return sum(map(abs, map(operator.sub, sort_bounded(seq1), sort_bounded(seq2))))
+
+
+def calculate_2_fast(seq1, seq2) -> int:
+    # Counter returns 0 for missing keys, even through __getitem__
+    cs2 = collections.Counter(seq2)
+    return sum(map(operator.mul, seq1, map(cs2.__getitem__, seq1)))
+
+
 def _test():
     with io.StringIO(TEST_VECTOR) as fin:
         left, right = consume(fin)
@@ -51,15 +98,24 @@ def _test():
     print("Test Vector Case 2 :", result)
     assert result == TEST_RESULT_2
 
+    left, right = consume_columns(TEST_VECTOR.encode())
+    assert calculate_1_fast(left, right) == TEST_RESULT_1
+    assert calculate_2_fast(left, right) == TEST_RESULT_2
+    assert sort_bounded([5, 3, 9, 3, 5, 5, 4, 3, 8, 7, 6]) == sorted(
+        [5, 3, 9, 3, 5, 5, 4, 3, 8, 7, 6]
+    )
+
 
 def _main():
-    with open_puzzle_input() as fin:
-        left, right = consume(fin)
+    with timed("parse"), map_puzzle_input() as buf:
+        left, right = consume_columns(buf)
 
-    result = calculate_1(left, right)
+    with timed("part1"):
+        result = calculate_1_fast(left, right)
     print("Actual Data Case 1:", result)
 
-    result = calculate_2(left, right)
+    with timed("part2"):
+        result = calculate_2_fast(left, right)
     print("Actual Data Case 2:", result)
 
 
@@ -2,8 +2,9 @@ from __future__ import annotations
 
 import io
 from itertools import combinations, pairwise
+from typing import Final
 
-from aoc2024_common import open_puzzle_input
+from aoc2024_common import iter_lines, map_puzzle_input, timed
 
 TEST_VECTOR = """\
 7 6 4 2 1
@@ -27,6 +28,47 @@ def check_safe_2(seq: list[int]) -> bool:
     return any(check_safe_1(dampened) for dampened in combinations(seq, len(seq) - 1))
 
 
+# Allowed (min, max) step of an increasing and of a decreasing report
+STEP_RANGES: Final[tuple[tuple[int, int], ...]] = ((1, 3), (-3, -1))
+
+
+def _first_bad_step(seq: list[int], lo: int, hi: int) -> int:
+    """Index i of the first step seq[i] -> seq[i + 1] outside lo..hi, or -1"""
+    for i, (a, b) in enumerate(pairwise(seq)):
+        if not lo <= b - a <= hi:
+            return i
+    return -1
+
+
+def check_safe_2_linear(seq: list[int]) -> bool:
+    """
+    Same result as check_safe_2() in O(n): whichever level gets dropped has to be one
+    of the two ends of the first bad step, so at most two candidates per direction
+    need to be re-checked.
+    """
+    if not seq:
+        return False
+    for lo, hi in STEP_RANGES:
+        if (i := _first_bad_step(seq, lo, hi)) == -1:
+            return True
+        for skip in (i, i + 1):
+            if _first_bad_step(seq[:skip] + seq[skip + 1 :], lo, hi) == -1:
+                return True
+    return False
+
+
+def count_safe(data: list[list[int]]) -> tuple[int, int]:
+    """Number of safe reports without and with the Problem Dampener, in one pass"""
+    safe_1 = safe_2 = 0
+    for seq in data:
+        if check_safe_1(seq):
+            safe_1 += 1
+            safe_2 += 1
+        elif check_safe_2_linear(seq):
+            safe_2 += 1
+    return safe_1, safe_2
+
+
 def consume(stream) -> list[list[int]]:
     data: list[list[int]] = []
     for ln in stream:
@@ -46,15 +88,21 @@ def _test():
     print("Test Vector Case 2:", result)
     assert result == TEST_RESULT_2
 
+    assert count_safe(data) == (TEST_RESULT_1, TEST_RESULT_2)
+    for seq in ([1, 5, 6, 7], [1, 2, 3, 9], [5, 1, 2, 3], [3, 2, 4, 5], [1], [1, 1]):
+        assert check_safe_2_linear(seq) == check_safe_2(seq), seq
+
 
 def _main():
-    with open_puzzle_input() as fin:
-        data = consume(fin)
+    with timed("parse"), map_puzzle_input() as buf:
+        data = consume(iter_lines(buf))
 
-    result = sum(check_safe_1(seq) for seq in data)
+    with timed("part1"):
+        result = sum(check_safe_1(seq) for seq in data)
     print("Actual Data Case 1:", result)
 
-    result = sum(check_safe_2(seq) for seq in data)
+    with timed("part2"):
+        result = sum(check_safe_2_linear(seq) for seq in data)
     print("Actual Data Case 2:", result)
 
 
@@ -1,9 +1,20 @@
 from __future__ import annotations
 
 import io
+import itertools
 import re
 
-from aoc2024_common import open_puzzle_input
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import BinaryIO, NamedTuple
+
+from aoc2024_common import (
+    default_workers,
+    map_puzzle_input,
+    puzzle_input_path,
+    timed,
+)
 
 TEST_VECTOR_1 = """\
 xmul(2,4)%&mul[3,7]!@^do_not_mul(5,5)+mul(32,64]then(mul(11,8)mul(8,5))
@@ -47,6 +58,158 @@ def calculate_2(s: str) -> int:
     return acc
 
 
+# A tail of the buffer that might be the start of a token continuing in the next chunk
+RE_PARTIAL_B = re.compile(
+    rb"(?:m(?:u(?:l(?:\((?:\d+(?:,\d*)?)?)?)?)?|d(?:o(?:\(|n(?:'(?:t\(?)?)?)?)?)\Z"
+)
+RE_OP_B = re.compile(RE_OP.pattern.encode())
+
+
+class Scanner:
+    """
+    Incremental version of calculate_1() and calculate_2(). Feed it the corrupted
+    memory in chunks of any size; a token cut in two by a chunk boundary is held back
+    until the rest of it arrives, so only that tail is kept between chunks.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.total_1 = 0
+        self.total_2 = 0
+        self.enabled = enabled
+        self._carry = b""
+
+    def feed(self, chunk: bytes | bytearray | memoryview):
+        buf = self._carry + chunk if self._carry else bytes(chunk)
+        end = 0
+        m: re.Match
+        for m in RE_OP_B.finditer(buf):
+            match m.group(0):
+                case b"do()":
+                    self.enabled = True
+                case b"don't()":
+                    self.enabled = False
+                case _:
+                    prod = int(m.group("d1")) * int(m.group("d2"))
+                    self.total_1 += prod
+                    if self.enabled:
+                        self.total_2 += prod
+            end = m.end()
+        if (m := RE_PARTIAL_B.search(buf, end)) is not None:
+            self._carry = buf[m.start() :]
+        else:
+            self._carry = b""
+
+    def finish(self) -> tuple[int, int]:
+        """Results of part 1 and part 2 for everything fed so far"""
+        # Whatever is still held back can no longer become a complete token
+        self._carry = b""
+        return self.total_1, self.total_2
+
+
+def scan_stream(stream: BinaryIO, chunk_size: int = 1 << 20) -> tuple[int, int]:
+    """Results of part 1 and part 2, reading stream chunk_size bytes at a time"""
+    scanner = Scanner()
+    while chunk := stream.read(chunk_size):
+        scanner.feed(chunk)
+    return scanner.finish()
+
+
+# Bytes that can never be part of a token, so the input can be split at any of them
+RE_NON_TOKEN_B = re.compile(rb"[^mul(),don't0-9]")
+
+
+class SegmentSummary(NamedTuple):
+    total_1: int
+    # Part 2 sum of the segment when it is entered with mul() enabled / disabled
+    if_enabled: int
+    if_disabled: int
+    # State at the end of the segment; None if it has no do() / don't() at all
+    final_state: bool | None
+
+
+def summarize(buf, start: int = 0, end: int | None = None) -> SegmentSummary:
+    """Summarize buf[start:end], which must not cut through a token"""
+    total_1 = before_toggle = after_toggle = 0
+    state: bool | None = None
+    m: re.Match
+    for m in RE_OP_B.finditer(buf, start, len(buf) if end is None else end):
+        match m.group(0):
+            case b"do()":
+                state = True
+            case b"don't()":
+                state = False
+            case _:
+                prod = int(m.group("d1")) * int(m.group("d2"))
+                total_1 += prod
+                if state is None:
+                    before_toggle += prod
+                elif state:
+                    after_toggle += prod
+    return SegmentSummary(total_1, before_toggle + after_toggle, after_toggle, state)
+
+
+def combine(summaries: Iterable[SegmentSummary], enabled=True) -> tuple[int, int]:
+    """Fold the summaries of consecutive segments into the part 1 and part 2 results"""
+    total_1 = total_2 = 0
+    for summary in summaries:
+        total_1 += summary.total_1
+        total_2 += summary.if_enabled if enabled else summary.if_disabled
+        if summary.final_state is not None:
+            enabled = summary.final_state
+    return total_1, total_2
+
+
+def split_points(buf, segments: int) -> list[int]:
+    """
+    Boundaries cutting buf into about `segments` equal parts, each moved forward to
+    the next byte that cannot be inside a token
+    """
+    size = len(buf)
+    points = [0]
+    for k in range(1, segments):
+        pos = max(size * k // segments, points[-1])
+        m = RE_NON_TOKEN_B.search(buf, pos)
+        points.append(size if m is None else m.start())
+    points.append(size)
+    return sorted(set(points))
+
+
+def _summarize_file(path: Path, start: int, end: int) -> SegmentSummary:
+    with map_puzzle_input(path) as buf:
+        return summarize(buf, start, end)
+
+
+def plan_segments(
+    path: Path, workers: int | None = None, min_segment: int = 1 << 20
+) -> list[int]:
+    """Boundaries of the segments scan_segments() should hand out to its workers"""
+    workers = workers or default_workers()
+    with map_puzzle_input(path) as buf:
+        segments = max(1, min(workers, len(buf) // min_segment))
+        return split_points(buf, segments)
+
+
+def scan_segments(path: Path, points: list[int]) -> tuple[int, int]:
+    """
+    Results of part 1 and part 2, scanning the segments between points on a process
+    pool and combining their summaries in order
+    """
+    if len(points) <= 2:
+        with map_puzzle_input(path) as buf:
+            return combine([summarize(buf)])
+    with ProcessPoolExecutor(max_workers=len(points) - 1) as pool:
+        summaries = pool.map(
+            _summarize_file, itertools.repeat(path), points[:-1], points[1:]
+        )
+        return combine(summaries)
+
+
+def scan_parallel(
+    path: Path, workers: int | None = None, min_segment: int = 1 << 20
+) -> tuple[int, int]:
+    return scan_segments(path, plan_segments(path, workers, min_segment))
+
+
 def consume(stream) -> str:
     lines = []
     for ln in stream:
@@ -72,16 +235,33 @@ def _test():
     print("Test Vector Case 2:", result)
     assert result == TEST_RESULT_2
 
+    for vector in (TEST_VECTOR_1, TEST_VECTOR_2):
+        expect = calculate_1(vector), calculate_2(vector)
+        for chunk_size in range(1, 12):
+            with io.BytesIO(vector.encode()) as fin:
+                assert scan_stream(fin, chunk_size) == expect, chunk_size
+    print("Streaming scanner agrees")
 
-def _main():
-    with open_puzzle_input() as fin:
-        data = consume(fin)
+    for vector in (TEST_VECTOR_1, TEST_VECTOR_2):
+        expect = calculate_1(vector), calculate_2(vector)
+        buf = vector.encode()
+        for segments in range(1, 8):
+            points = split_points(buf, segments)
+            summaries = [summarize(buf, a, b) for a, b in itertools.pairwise(points)]
+            assert combine(summaries) == expect, segments
+    print("Segment summaries agree")
 
-    result = calculate_1(data)
-    print("Actual Data Case 1:", result)
 
-    result = calculate_2(data)
-    print("Actual Data Case 2:", result)
+def _main():
+    path = puzzle_input_path()
+    with timed("parse"):
+        points = plan_segments(path)
+
+    # Each segment's scan answers both parts at once, so they share one stage
+    with timed("part1+2"):
+        result_1, result_2 = scan_segments(path, points)
+    print("Actual Data Case 1:", result_1)
+    print("Actual Data Case 2:", result_2)
 
 
 if __name__ == "__main__":
@@ -1,11 +1,12 @@
 from __future__ import annotations
 
 import io
-from enum import IntEnum
-from itertools import product
-from typing import Final
 
-from aoc2024_common import open_puzzle_input
+from collections import deque
+from collections.abc import Iterable, Iterator
+from typing import Final, NamedTuple
+
+from aoc2024_common import Grid, Point, open_puzzle_input, timed
 
 TEST_VECTOR: Final[str] = """\
 MMMSXXMASM
@@ -23,65 +24,192 @@ TEST_RESULT_1: Final[int] = 18
 TEST_RESULT_2: Final[int] = 9
 
 
-class ScanDir(IntEnum):
-    dec = -1
-    stay = 0
-    inc = 1
+def count_xmas(matrix: list[str]) -> int:
+    # Pad by the length of "MAS" so that no scan can run off the grid
+    grid = Grid.from_lines(matrix, pad=3)
+    data = grid.data
+    m, a, s = b"MAS"
+    return sum(
+        data[idx + d] == m and data[idx + 2 * d] == a and data[idx + 3 * d] == s
+        for idx in grid.find_all(ord("X"))
+        for d in grid.dirs8
+    )
+
 
+def count_crossmas(matrix: list[str]) -> int:
+    _MS_PATT = {b"MSMS", b"MMSS", b"SMSM", b"SSMM"}
 
-def count_xmas(matrix: list[str]) -> int:
+    grid = Grid.from_lines(matrix)
+    data = grid.data
+    s = grid.stride
+    # Upper-left, upper-right, lower-left, lower-right
+    corners = (-s - 1, -s + 1, s - 1, s + 1)
 
-    def check_mas(sx, sy, dir_x: ScanDir, dir_y: ScanDir) -> bool:
-        if dir_x == dir_y == ScanDir.stay:
-            return False
-        _x, _y = sx, sy
-        try:
-            for c in "MAS":
-                _x += dir_x
-                _y += dir_y
-                # Prevent wraparound
-                if _y < 0 or _x < 0:
-                    return False
-                if matrix[_y][_x] != c:
-                    return False
-        except IndexError:
-            return False
-        return True
-
-    # fmt: off
     return sum(
-        sum(
-            check_mas(x, y, xd, yd)
-            for xd, yd in product(iter(ScanDir), iter(ScanDir))
-        )
-        for y, row in enumerate(matrix)
-        for x, char in enumerate(row)
-        if char == "X"
+        bytes(data[idx + d] for d in corners) in _MS_PATT
+        for idx in grid.find_all(ord("A"))
     )
-    # fmt: on
 
 
-def count_crossmas(matrix: list[str]) -> int:
-    _MS_PATT = {"MSMS", "MMSS", "SMSM", "SSMM"}
-
-    def check_ms(sx, sy) -> bool:
-        # fmt: off
-        cross_patt = "".join(
-            matrix[sy + dy][sx + dx]
-            for dy in (-1, 1)
-            for dx in (-1, 1)
-        )
-        # fmt: on
-        return cross_patt in _MS_PATT
-
-    accu = sum(
-        check_ms(x, y)
-        for y, row in enumerate(matrix[1:-1], 1)
-        for x, c in enumerate(row[1:-1], 1)
-        if c == "A"
+def _find_overlapping(line: bytes, word: bytes) -> Iterator[int]:
+    start = 0
+    while (pos := line.find(word, start)) != -1:
+        yield pos
+        start = pos + 1
+
+
+def _count_in_line(line: bytes, word: bytes, overlaps: bool) -> int:
+    if not overlaps:
+        # bytes.count() skips past each match, which is only right if no two matches
+        # can overlap
+        return line.count(word)
+    return sum(1 for _ in _find_overlapping(line, word))
+
+
+def _self_overlaps(word: bytes) -> bool:
+    """Whether two occurrences of word can overlap, i.e. it has a border"""
+    return any(word[:n] == word[-n:] for n in range(1, len(word)))
+
+
+def count_word(matrix: list[str], word: str = "XMAS") -> int:
+    """
+    Occurrences of word in any of the 8 directions, found by searching every row,
+    column and diagonal of the grid as one bytes string, forwards and backwards. Like
+    count_xmas(), each (start cell, direction) that reads word counts once, so a
+    palindrome counts in both directions and a single letter 8 times per cell.
+    """
+    grid = Grid.from_lines(matrix)
+    target = word.encode()
+    overlaps = _self_overlaps(target)
+    targets = [(target, overlaps), (target[::-1], overlaps)]
+    return sum(
+        _count_in_line(line, t, overlaps)
+        for _, _, line in grid.scan_lines()
+        for t, overlaps in targets
     )
 
-    return accu
+
+def count_cross(matrix: list[str], word: str = "MAS") -> int:
+    """
+    Number of cells at which word crosses itself diagonally in an X, each diagonal
+    reading word either way. word must have an odd length
+    """
+    if len(word) % 2 == 0:
+        raise ValueError("Crossing word must have an odd length")
+    grid = Grid.from_lines(matrix)
+    target = word.encode()
+    mid = len(target) // 2
+    centers: dict[int, set[int]] = {grid.stride + 1: set(), grid.stride - 1: set()}
+    for start, step, line in grid.scan_lines():
+        if (found := centers.get(step)) is None:
+            continue
+        for t in {target, target[::-1]}:
+            found.update(
+                start + (pos + mid) * step for pos in _find_overlapping(line, t)
+            )
+    diag, antidiag = centers.values()
+    return len(diag & antidiag)
+
+
+class AhoCorasick:
+    """
+    Aho-Corasick automaton over bytes: finds all occurrences of all words in one pass
+    over the text, however many words there are
+    """
+
+    def __init__(self, words: Iterable[str]):
+        self.words: list[bytes] = [w.encode() for w in words]
+        if not all(self.words):
+            raise ValueError("Cannot search for an empty word")
+        goto: list[dict[int, int]] = [{}]
+        outputs: list[list[int]] = [[]]
+        for word_idx, word in enumerate(self.words):
+            state = 0
+            for c in word:
+                if (nxt := goto[state].get(c)) is None:
+                    nxt = len(goto)
+                    goto[state][c] = nxt
+                    goto.append({})
+                    outputs.append([])
+                state = nxt
+            outputs[state].append(word_idx)
+
+        # Breadth-first, turn the trie into a full transition table: a missing edge
+        # follows the failure link, and each state also reports its failure's words
+        fail = [0] * len(goto)
+        self.delta: list[dict[int, int]] = [dict(goto[0])]
+        self.delta.extend({} for _ in range(len(goto) - 1))
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            outputs[state].extend(outputs[fail[state]])
+            delta = dict(self.delta[fail[state]])
+            for c, nxt in goto[state].items():
+                fail[nxt] = self.delta[fail[state]].get(c, 0)
+                delta[c] = nxt
+                queue.append(nxt)
+            self.delta[state] = delta
+        self.outputs: list[tuple[int, ...]] = [tuple(o) for o in outputs]
+
+    def iter_matches(self, text: bytes) -> Iterator[tuple[int, int]]:
+        """Yield (end position, word index) of every match; end is inclusive"""
+        delta = self.delta
+        outputs = self.outputs
+        state = 0
+        for pos, c in enumerate(text):
+            state = delta[state].get(c, 0)
+            for word_idx in outputs[state]:
+                yield pos, word_idx
+
+
+class WordMatch(NamedTuple):
+    word: str
+    start: Point
+    direction: Point
+
+
+def search_words(
+    matrix: list[str], words: Iterable[str], positions: bool = False
+) -> tuple[dict[str, int], list[WordMatch] | None]:
+    """
+    Count every word in any of the 8 directions, streaming each row, column and
+    diagonal of the grid through one Aho-Corasick automaton in both directions.
+    Optionally also return where each match starts and which way it reads. Counts
+    follow count_word(): once per (start cell, direction) that reads the word.
+    """
+    automaton = AhoCorasick(words)
+    words = [w.decode() for w in automaton.words]
+    lengths = [len(w) for w in automaton.words]
+    grid = Grid.from_lines(matrix)
+    s = grid.stride
+    directions = {
+        1: Point(1, 0),
+        s: Point(0, 1),
+        s + 1: Point(1, 1),
+        s - 1: Point(-1, 1),
+    }
+
+    counts = [0] * len(words)
+    matches: list[WordMatch] | None = [] if positions else None
+    for start, step, line in grid.scan_lines():
+        for reverse in (False, True):
+            text = line[::-1] if reverse else line
+            for end, word_idx in automaton.iter_matches(text):
+                length = lengths[word_idx]
+                counts[word_idx] += 1
+                if matches is None:
+                    continue
+                first = end - length + 1
+                if reverse:
+                    first = len(line) - 1 - first
+                matches.append(
+                    WordMatch(
+                        words[word_idx],
+                        grid.point(start + first * step),
+                        -directions[step] if reverse else directions[step],
+                    )
+                )
+    return dict(zip(words, counts)), matches
 
 
 def consume(stream) -> list[str]:
@@ -105,15 +233,37 @@ def _test():
     print("Test Vector Case 2:", result)
     assert result == TEST_RESULT_2
 
+    assert count_word(matrix, "XMAS") == TEST_RESULT_1
+    assert count_cross(matrix, "MAS") == TEST_RESULT_2
+    # "AMA" reads the same both ways; "MM" and "AA" can overlap themselves
+    assert count_word(["AMAMA"], "AMA") == 4
+    assert count_word(["MMM"], "MM") == 4
+    # One letter reads in all 8 directions from its cell
+    assert count_word(["AB", "BA"], "A") == 16
+    assert count_cross(["A.A", ".A.", "A.A"], "A") == 5
+    assert count_cross(["M.S", ".A.", "M.S"], "MAS") == 1
+
+    dictionary = ["XMAS", "MAS", "SAM", "AMA", "X", "MM", "ZZZ"]
+    counts, matches = search_words(matrix, dictionary, positions=True)
+    assert counts == {w: count_word(matrix, w) for w in dictionary}
+    assert counts["X"] == 19 * 8
+    for word, start, direction in matches:
+        cells = (start + direction * i for i in range(len(word)))
+        assert "".join(p @ matrix for p in cells) == word
+    assert len(matches) == sum(counts.values())
+    print("Dictionary search agrees")
+
 
 def _main():
-    with open_puzzle_input() as fin:
+    with timed("parse"), open_puzzle_input() as fin:
         matrix = consume(fin)
 
-    result = count_xmas(matrix)
+    with timed("part1"):
+        result = count_word(matrix, "XMAS")
     print("Actual Data Case 1:", result)
 
-    result = count_crossmas(matrix)
+    with timed("part2"):
+        result = count_cross(matrix, "MAS")
     print("Actual Data Case 2:", result)
 
 
@@ -3,9 +3,10 @@ from __future__ import annotations
 import io
 import re
 
+from collections import deque
 from typing import Final, TYPE_CHECKING
 
-from aoc2024_common import open_puzzle_input
+from aoc2024_common import open_puzzle_input, timed
 
 TEST_VECTOR: Final[str] = """\
 47|53
@@ -44,53 +45,141 @@ TEST_RESULT_2: Final[int] = 123
 
 if TYPE_CHECKING:
     RulesDict = dict[tuple[str, str], re.Pattern]
+    # Page -> pages that must come after it
+    RuleIndex = dict[str, set[str]]
 
+_NO_PAGES: Final[frozenset[str]] = frozenset()
 
-def is_correct_order(rules: list[tuple[str, str]], line: list[str]) -> bool:
-    applicable = 0
-    correct = 0
+
+def index_rules(rules: list[tuple[str, str]]) -> RuleIndex:
+    index: RuleIndex = {}
     for a, b in rules:
-        if a not in line or b not in line:
-            continue
-        applicable += 1
-        correct += line.index(a) < line.index(b)
-    return correct == applicable
+        index.setdefault(a, set()).add(b)
+    return index
+
+
+def is_correct_order(index: RuleIndex, line: list[str]) -> bool:
+    seen: set[str] = set()
+    for page in line:
+        # Wrong if any page already seen is one that has to come after this page
+        if not index.get(page, _NO_PAGES).isdisjoint(seen):
+            return False
+        seen.add(page)
+    return True
+
+
+def correct_order(index: RuleIndex, line: list[str]) -> list[str]:
+    """Reorder line to satisfy the rules, by Kahn's topological sort of its pages"""
+    pages = set(line)
+    successors = {page: index.get(page, _NO_PAGES) & pages for page in line}
+    in_degree = dict.fromkeys(line, 0)
+    for after in successors.values():
+        for page in after:
+            in_degree[page] += 1
+    ready = deque(page for page in line if not in_degree[page])
+    ordered: list[str] = []
+    while ready:
+        page = ready.popleft()
+        ordered.append(page)
+        for nxt in successors[page]:
+            in_degree[nxt] -= 1
+            if not in_degree[nxt]:
+                ready.append(nxt)
+    if len(ordered) != len(pages):
+        raise ValueError(f"Rules for {line} contain a cycle")
+    return ordered
 
 
 def check_1(rules: list[tuple[str, str]], data: list[list[str]]) -> int:
+    index = index_rules(rules)
     # fmt: off
     valid: list[list[str]] = [
         ln
         for ln in data
-        if is_correct_order(rules, ln)
+        if is_correct_order(index, ln)
     ]
     # fmt: on
     return sum(int(v[len(v) // 2]) for v in valid)
 
 
 def check_2(rules: list[tuple[str, str]], data: list[list[str]]) -> int:
+    index = index_rules(rules)
     # fmt: off
-    invalid: list[list[str]] = [
-        ln
+    corrected: list[list[str]] = [
+        correct_order(index, ln)
         for ln in data
-        if not is_correct_order(rules, ln)
+        if not is_correct_order(index, ln)
     ]
     # fmt: on
-    corrected: list[list[str]] = []
-    ln: list[str]
-    for ln in invalid:
-        # We're basically doing Exchange Sort here
-        while not is_correct_order(rules, ln):
-            for a, b in rules:
-                if a not in ln or b not in ln:
-                    continue
-                ia, ib = ln.index(a), ln.index(b)
-                if ia > ib:
-                    ln[ia], ln[ib] = ln[ib], ln[ia]
-        corrected.append(ln)
     return sum(int(ln[len(ln) // 2]) for ln in corrected)
 
 
+class IncrementalValidator:
+    """
+    Keeps the answers of check_1() and check_2() up to date as rules and updates
+    arrive one at a time. A new rule only re-checks the updates containing both of its
+    pages, found through an inverted index of page -> updates.
+    """
+
+    def __init__(self):
+        self.index: RuleIndex = {}
+        self.updates: list[list[str]] = []
+        self.total_1 = 0
+        self.total_2 = 0
+        self._by_page: dict[str, set[int]] = {}
+        # Per update: whether it is correctly ordered, and its middle page number
+        # (after correction if it was not)
+        self._results: list[tuple[bool, int]] = []
+
+    def add_rule(self, a: str, b: str):
+        if b in (after := self.index.setdefault(a, set())):
+            return
+        after.add(b)
+        by_page = self._by_page
+        if a not in by_page or b not in by_page:
+            return
+        for uid in by_page[a] & by_page[b]:
+            line = self.updates[uid]
+            correct, _ = self._results[uid]
+            # Already in the order the rule asks for, so nothing can change
+            if correct and line.index(a) < line.index(b):
+                continue
+            self._evaluate(uid)
+
+    def add_update(self, line: list[str]):
+        uid = len(self.updates)
+        self.updates.append(line)
+        self._results.append((True, 0))
+        for page in line:
+            self._by_page.setdefault(page, set()).add(uid)
+        self._evaluate(uid)
+
+    def feed_line(self, ln: str):
+        """Add a rule or an update given as a line of puzzle input"""
+        if not (ln := ln.strip()):
+            return
+        if "|" in ln:
+            self.add_rule(*ln.split("|"))
+        else:
+            self.add_update(ln.split(","))
+
+    def _evaluate(self, uid: int):
+        line = self.updates[uid]
+        old_correct, old_middle = self._results[uid]
+        if old_correct:
+            self.total_1 -= old_middle
+        else:
+            self.total_2 -= old_middle
+        if correct := is_correct_order(self.index, line):
+            middle = int(line[len(line) // 2])
+            self.total_1 += middle
+        else:
+            fixed = correct_order(self.index, line)
+            middle = int(fixed[len(fixed) // 2])
+            self.total_2 += middle
+        self._results[uid] = correct, middle
+
+
 def consume(stream) -> tuple[list[tuple[str, str]], list[list[str]]]:
     rules: list[tuple[str, str]] = []
     data: list[list[str]] = []
@@ -117,15 +206,30 @@ def _test():
     print("Test Vector Case 2:", result)
     assert result == TEST_RESULT_2
 
+    # Stream the rules and updates in a scrambled, interleaved order
+    lines = TEST_VECTOR.splitlines()
+    lines = lines[1::2] + lines[::2]
+    validator = IncrementalValidator()
+    for n, ln in enumerate(lines, 1):
+        validator.feed_line(ln)
+        with io.StringIO("\n".join(lines[:n])) as fin:
+            rules_n, data_n = consume(fin)
+        assert validator.total_1 == check_1(rules_n, data_n)
+        assert validator.total_2 == check_2(rules_n, data_n)
+    assert (validator.total_1, validator.total_2) == (TEST_RESULT_1, TEST_RESULT_2)
+    print("Incremental validator agrees")
+
 
 def _main():
-    with open_puzzle_input() as fin:
+    with timed("parse"), open_puzzle_input() as fin:
         rules2, data2 = consume(fin)
 
-    result = check_1(rules2, data2)
+    with timed("part1"):
+        result = check_1(rules2, data2)
     print("Actual Data Case 1:", result)
 
-    result = check_2(rules2, data2)
+    with timed("part2"):
+        result = check_2(rules2, data2)
     print("Actual Data Case 2:", result)
 
 
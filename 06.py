@@ -1,11 +1,15 @@
 from __future__ import annotations
 
+import bisect
 import io
 import itertools
 
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
 from typing import Final
 
-from aoc2024_common import open_puzzle_input
+from aoc2024_common import default_workers, open_puzzle_input, timed
 
 TEST_VECTOR = """\
 ....#.....
@@ -76,30 +80,281 @@ def walk_map(
                 return None
 
 
+_NOTHING: Final[list[int]] = []
+
+
+class ObstructionIndex:
+    """
+    The obstructions sorted per row and per column, so that a whole straight run of the
+    guard is found with a single bisect instead of stepping cell by cell
+    """
+
+    def __init__(self, dim_x: int, dim_y: int, obstructions: set[tuple[int, int]]):
+        self.dim_x = dim_x
+        self.dim_y = dim_y
+        self.rows: dict[int, list[int]] = {}
+        self.cols: dict[int, list[int]] = {}
+        for x, y in obstructions:
+            self.rows.setdefault(y, []).append(x)
+            self.cols.setdefault(x, []).append(y)
+        for line in itertools.chain(self.rows.values(), self.cols.values()):
+            line.sort()
+
+    def next_stop(
+        self, x: int, y: int, dir_idx: int, extra: tuple[int, int] | None = None
+    ) -> tuple[int, int, bool]:
+        """
+        Walk from (x, y) in DIRECTIONS[dir_idx] until just before an obstruction. Return
+        that cell and False, or the last cell on the map and True if the guard walks
+        off it. `extra` is one additional obstruction to take into account.
+        """
+        ex, ey = extra if extra is not None else (-1, -1)
+        match dir_idx:
+            case 0:  # Up: nearest obstruction above
+                ys = self.cols.get(x, _NOTHING)
+                i = bisect.bisect_left(ys, y) - 1
+                stop = ys[i] if i >= 0 else -1
+                if ex == x and stop < ey < y:
+                    stop = ey
+                return (x, stop + 1, False) if stop >= 0 else (x, 0, True)
+            case 1:  # Right
+                xs = self.rows.get(y, _NOTHING)
+                i = bisect.bisect_right(xs, x)
+                stop = xs[i] if i < len(xs) else self.dim_x
+                if ey == y and x < ex < stop:
+                    stop = ex
+                if stop < self.dim_x:
+                    return stop - 1, y, False
+                return self.dim_x - 1, y, True
+            case 2:  # Down
+                ys = self.cols.get(x, _NOTHING)
+                i = bisect.bisect_right(ys, y)
+                stop = ys[i] if i < len(ys) else self.dim_y
+                if ex == x and y < ey < stop:
+                    stop = ey
+                if stop < self.dim_y:
+                    return x, stop - 1, False
+                return x, self.dim_y - 1, True
+            case _:  # Left
+                xs = self.rows.get(y, _NOTHING)
+                i = bisect.bisect_left(xs, x) - 1
+                stop = xs[i] if i >= 0 else -1
+                if ey == y and stop < ex < x:
+                    stop = ex
+                return (stop + 1, y, False) if stop >= 0 else (0, y, True)
+
+
+def patrol(
+    index: ObstructionIndex,
+    guard_start: tuple[int, int],
+    extra: tuple[int, int] | None = None,
+    dir_idx: int = 0,
+) -> list[tuple[int, int, int]] | None:
+    """
+    The guard's route as the list of (x, y, direction index) where each straight run
+    starts, ending with the cell where the guard leaves the map. None if the guard
+    gets stuck in a loop, which is detected at turning points only.
+    """
+    x, y = guard_start
+    route = [(x, y, dir_idx)]
+    turns: set[tuple[int, int, int]] = set()
+    while True:
+        x, y, exited = index.next_stop(x, y, dir_idx, extra)
+        if exited:
+            route.append((x, y, dir_idx))
+            return route
+        if (state := (x, y, dir_idx)) in turns:
+            return None
+        turns.add(state)
+        dir_idx = (dir_idx + 1) % 4
+        route.append((x, y, dir_idx))
+
+
+def walk_map_fast(
+    dim_x, dim_y, obstructions: set[tuple[int, int]], guard_start: tuple[int, int]
+) -> set[tuple[int, int]] | None:
+    """Cells visited by the guard, like the keys of walk_map(); None on a loop"""
+    if (
+        route := patrol(ObstructionIndex(dim_x, dim_y, obstructions), guard_start)
+    ) is None:
+        return None
+    passed: set[tuple[int, int]] = set()
+    for (x1, y1, _), (x2, y2, _) in itertools.pairwise(route):
+        for x in range(min(x1, x2), max(x1, x2) + 1):
+            for y in range(min(y1, y2), max(y1, y2) + 1):
+                passed.add((x, y))
+    return passed
+
+
+def _loops_from(
+    index: ObstructionIndex,
+    x: int,
+    y: int,
+    dir_idx: int,
+    extra: tuple[int, int],
+    visit: bytearray,
+    touched: list[int],
+) -> bool:
+    """
+    Whether the guard, standing at (x, y) facing DIRECTIONS[dir_idx], ends up in a loop
+    once extra is obstructed. visit holds a 4-bit mask of directions per cell for the
+    turning points; it must be all zeroes on entry and is left that way on exit.
+    """
+    dim_x = index.dim_x
+    try:
+        while True:
+            x, y, exited = index.next_stop(x, y, dir_idx, extra)
+            if exited:
+                return False
+            cell = y * dim_x + x
+            bit = 1 << dir_idx
+            if (mask := visit[cell]) & bit:
+                return True
+            if not mask:
+                touched.append(cell)
+            visit[cell] = mask | bit
+            dir_idx = (dir_idx + 1) % 4
+    finally:
+        # Resetting only the cells used is much cheaper than a new bytearray
+        for cell in touched:
+            visit[cell] = 0
+        touched.clear()
+
+
+def loop_candidates(
+    dim_x, dim_y, obstructions: set[tuple[int, int]], guard_start: tuple[int, int]
+) -> Iterator[tuple[tuple[int, int], tuple[int, int, int]]]:
+    """
+    Walk the original patrol and yield, for every cell the guard reaches, that cell
+    along with the guard's (x, y, direction index) just before first reaching it. Only
+    these cells can change the route, and a trial can resume from that state.
+    """
+    reached = bytearray(dim_x * dim_y)
+    reached[guard_start[1] * dim_x + guard_start[0]] = 1
+    # Direction masks of the original walk, to stop should it loop by itself
+    walked = bytearray(dim_x * dim_y)
+    x, y = guard_start
+    dir_idx = 0
+    while True:
+        cell = y * dim_x + x
+        if walked[cell] & (bit := 1 << dir_idx):
+            return
+        walked[cell] |= bit
+        dx, dy = DIRECTIONS[dir_idx]
+        nx = x + dx
+        ny = y + dy
+        if (nx, ny) in obstructions:
+            dir_idx = (dir_idx + 1) % 4
+            continue
+        if not ((0 <= nx < dim_x) and (0 <= ny < dim_y)):
+            return
+        if not reached[ncell := ny * dim_x + nx]:
+            reached[ncell] = 1
+            yield (nx, ny), (x, y, dir_idx)
+        x, y = nx, ny
+
+
+def _trials(
+    index: ObstructionIndex,
+    obstructions: set[tuple[int, int]],
+    guard_start: tuple[int, int],
+) -> Iterator[tuple[tuple[int, int], tuple[int, int, int]]]:
+    """(cell to obstruct, state to resume the guard from) for every trial needed"""
+    dim_x, dim_y = index.dim_x, index.dim_y
+    if patrol(index, guard_start) is None:
+        # The guard loops already, so any cell will do; each still needs its trial
+        # from the very start, as it may be on the route
+        return (
+            ((x, y), (*guard_start, 0))
+            for y in range(dim_y)
+            for x in range(dim_x)
+            if (x, y) != guard_start and (x, y) not in obstructions
+        )
+    return loop_candidates(dim_x, dim_y, obstructions, guard_start)
+
+
 def create_loop(
     dim_x, dim_y, obstructions: set[tuple[int, int]], guard_start: tuple[int, int]
 ):
+    index = ObstructionIndex(dim_x, dim_y, obstructions)
+    visit = bytearray(dim_x * dim_y)
+    touched: list[int] = []
     new_obstructions: set[tuple[int, int]] = set()
-    ctr = itertools.count()
-    found_ctr = itertools.count()
-    for y in range(dim_y):
-        for x in range(dim_x):
-            if next(ctr) % 100 == 0:
-                print(".", end="", flush=True)
-            trypos = x, y
-            if trypos == guard_start or trypos in obstructions:
-                continue
-            tryobs = obstructions.copy()
-            tryobs.add(trypos)
-            if walk_map(dim_x, dim_y, tryobs, guard_start) is not None:
-                continue
-            if next(found_ctr) % 10 == 0:
-                print("+", end="", flush=True)
+    for trypos, (x, y, dir_idx) in _trials(index, obstructions, guard_start):
+        if _loops_from(index, x, y, dir_idx, trypos, visit, touched):
             new_obstructions.add(trypos)
-    print()
     return new_obstructions
 
 
+# Per worker process: the shared map, plus the index and scratch space built from it
+_worker: dict = {}
+
+
+def _init_worker(shm_name: str, dim_x: int, dim_y: int):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    cells = shm.buf
+    obstructions = set()
+    # Cells holding 1 are obstructions
+    for y in range(dim_y):
+        row = bytes(cells[y * dim_x : (y + 1) * dim_x])
+        x = -1
+        while (x := row.find(1, x + 1)) != -1:
+            obstructions.add((x, y))
+    _worker["shm"] = shm
+    _worker["index"] = ObstructionIndex(dim_x, dim_y, obstructions)
+    _worker["visit"] = bytearray(dim_x * dim_y)
+    _worker["touched"] = []
+
+
+def _try_batch(
+    batch: list[tuple[tuple[int, int], tuple[int, int, int]]],
+) -> list[tuple[int, int]]:
+    index = _worker["index"]
+    visit = _worker["visit"]
+    touched = _worker["touched"]
+    return [
+        trypos
+        for trypos, (x, y, dir_idx) in batch
+        if _loops_from(index, x, y, dir_idx, trypos, visit, touched)
+    ]
+
+
+def create_loop_parallel(
+    dim_x,
+    dim_y,
+    obstructions: set[tuple[int, int]],
+    guard_start: tuple[int, int],
+    workers: int | None = None,
+    batch_size: int = 256,
+):
+    """
+    create_loop() with the trials fanned out in batches to a process pool. The map is
+    placed in shared memory once, and every worker builds its own index from it.
+    """
+    workers = workers or default_workers()
+    index = ObstructionIndex(dim_x, dim_y, obstructions)
+    trials = list(_trials(index, obstructions, guard_start))
+    if workers == 1 or len(trials) <= batch_size:
+        return create_loop(dim_x, dim_y, obstructions, guard_start)
+
+    batches = [trials[i : i + batch_size] for i in range(0, len(trials), batch_size)]
+    shm = shared_memory.SharedMemory(create=True, size=max(1, dim_x * dim_y))
+    try:
+        for x, y in obstructions:
+            shm.buf[y * dim_x + x] = 1
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(batches)),
+            initializer=_init_worker,
+            initargs=(shm.name, dim_x, dim_y),
+        ) as pool:
+            # map() hands results back in submission order, whatever finishes first
+            found = list(itertools.chain.from_iterable(pool.map(_try_batch, batches)))
+    finally:
+        shm.close()
+        shm.unlink()
+    return set(found)
+
+
 def _test():
     with io.StringIO(TEST_VECTOR) as fin:
         dim_x, dim_y, obstructions, guard_start = consume(fin)
@@ -107,24 +362,28 @@ def _test():
     result = len(passed)
     print("Test 1:", result)
     assert result == TEST_EXPECT_1
+    assert walk_map_fast(dim_x, dim_y, obstructions, guard_start) == passed.keys()
 
-    print("Calculating Test 2 ...", end="")
     new_obstructions = create_loop(dim_x, dim_y, obstructions, guard_start)
     result = len(new_obstructions)
     print("Test 2:", result)
     assert result == TEST_EXPECT_2
+    assert new_obstructions == create_loop_parallel(
+        dim_x, dim_y, obstructions, guard_start, workers=2, batch_size=4
+    )
 
 
 def _main():
-    with open_puzzle_input() as fin:
+    with timed("parse"), open_puzzle_input() as fin:
         dim_x, dim_y, obstructions, guard_start = consume(fin)
 
-    passed = walk_map(dim_x, dim_y, obstructions, guard_start)
+    with timed("part1"):
+        passed = walk_map_fast(dim_x, dim_y, obstructions, guard_start)
     result = len(passed)
     print("Case 1:", result)
 
-    print("Calculating Case 2 ...", end="")
-    new_obstructions = create_loop(dim_x, dim_y, obstructions, guard_start)
+    with timed("part2"):
+        new_obstructions = create_loop_parallel(dim_x, dim_y, obstructions, guard_start)
     result = len(new_obstructions)
     print("Case 2:", result)
 
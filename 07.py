@@ -5,11 +5,19 @@ import itertools
 import operator
 import re
 
+from array import array
 from collections import deque
 from collections.abc import Callable
 from typing import Final, TYPE_CHECKING
 
-from aoc2024_common import open_puzzle_input
+from aoc2024_common import (
+    cached_consume,
+    iter_lines,
+    pack_ragged,
+    pattern_for,
+    timed,
+    unpack_ragged,
+)
 
 TEST_VECTOR: Final[str] = """\
 190: 10 19
@@ -33,7 +41,7 @@ def consume(stream):
     data: list = []
     for ln in stream:
         ln = ln.strip()
-        if (m := RE_PARSE.match(ln)) is None:
+        if (m := pattern_for(RE_PARSE, ln).match(ln)) is None:
             continue
         want = int(m.group("want"))
         operands = [int(d) for d in m.group("rest").split()]
@@ -41,8 +49,24 @@ def consume(stream):
     return data
 
 
+def pack_data(data) -> dict[str, array]:
+    values, offsets = pack_ragged(operands for _, operands in data)
+    return {
+        "wants": array("q", (want for want, _ in data)),
+        "values": values,
+        "offsets": offsets,
+    }
+
+
+def unpack_data(arrays: dict[str, array]):
+    operands = unpack_ragged(arrays["values"], arrays["offsets"])
+    return [[want, opnds] for want, opnds in zip(arrays["wants"], operands)]
+
+
 if TYPE_CHECKING:
     IntOperator = Callable[[int, int], int]
+    # Given the result and the right operand, the left operand, or None if there is none
+    InverseOperator = Callable[[int, int], int | None]
 
 
 def validate(want: int, operands: list[int], valid_ops: list[IntOperator]) -> bool:
@@ -67,6 +91,108 @@ def concat(a: int, b: int) -> int:
     return int(f"{a}{b}")
 
 
+INVERSE_OPS: dict[IntOperator, InverseOperator] = {}
+
+
+def inverse_of(op: IntOperator):
+    """Register the decorated function as the inverse of op, for solve_backward()"""
+
+    def register(inverse: InverseOperator) -> InverseOperator:
+        INVERSE_OPS[op] = inverse
+        return inverse
+
+    return register
+
+
+@inverse_of(operator.add)
+def _unadd(result: int, b: int) -> int | None:
+    return result - b if result >= b else None
+
+
+@inverse_of(operator.mul)
+def _unmul(result: int, b: int) -> int | None:
+    return result // b if result % b == 0 else None
+
+
+@inverse_of(concat)
+def _unconcat(result: int, b: int) -> int | None:
+    shift = 10
+    while shift <= b:
+        shift *= 10
+    # The left operand is at least 1, so result must be strictly longer than b
+    return result // shift if result > b and result % shift == b else None
+
+
+def solve_backward(
+    want: int, operands: list[int], valid_ops: list[IntOperator]
+) -> bool:
+    """
+    Same answer as validate(), but peels the operands off from the right, undoing each
+    operator on want. Most inverses fail fast (want not divisible, not ending in the
+    operand's digits, ...), which prunes whole subtrees.
+    """
+    inverses = [INVERSE_OPS.get(op) for op in valid_ops]
+    # The inverses assume positive operands; anything else goes the long way
+    if None in inverses or min(operands) <= 0:
+        return validate(want, operands, valid_ops)
+    first = operands[0]
+    stack = [(want, len(operands) - 1)]
+    while stack:
+        result, i = stack.pop()
+        if i == 0:
+            if result == first:
+                return True
+            continue
+        b = operands[i]
+        for inverse in inverses:
+            if (prev := inverse(result, b)) is not None:
+                stack.append((prev, i - 1))
+    return False
+
+
+def validate_batch(
+    data: list, valid_ops: list[IntOperator], max_frontier: int = 1 << 20
+) -> list[bool]:
+    """
+    validate() for every equation in data at once. Equations with the same number of
+    operands advance together, one operand per level, as a frontier of (owner, value)
+    pairs; values above the owner's want are dropped. A group whose frontier grows past
+    max_frontier pairs hands its live equations over to solve_backward() instead.
+    """
+    results = [False] * len(data)
+    groups: dict[int, list[int]] = {}
+    for i, (_, operands) in enumerate(data):
+        groups.setdefault(len(operands), []).append(i)
+
+    for size, members in groups.items():
+        wants = [data[i][0] for i in members]
+        columns = [[data[i][1][k] for i in members] for k in range(size)]
+        owners = list(range(len(members)))
+        values = columns[0].copy()
+        for column in columns[1:]:
+            operands = list(map(column.__getitem__, owners))
+            limits = list(map(wants.__getitem__, owners))
+            frontier: dict[tuple[int, int], None] = {}
+            for op in valid_ops:
+                reached = list(map(op, values, operands))
+                keep = map(operator.le, reached, limits)
+                frontier.update(
+                    dict.fromkeys(itertools.compress(zip(owners, reached), keep))
+                )
+            owners = [owner for owner, _ in frontier]
+            values = [value for _, value in frontier]
+            if len(frontier) > max_frontier:
+                for owner in set(owners):
+                    want, opnds = data[members[owner]]
+                    results[members[owner]] = solve_backward(want, opnds, valid_ops)
+                break
+        else:
+            for owner, value in zip(owners, values):
+                if value == wants[owner]:
+                    results[members[owner]] = True
+    return results
+
+
 VALID_OPS_1: Final[list[IntOperator]] = [
     operator.add,
     operator.mul,
@@ -81,32 +207,51 @@ VALID_OPS_2: Final[list[IntOperator]] = [
 def _test():
     with io.StringIO(TEST_VECTOR) as fin:
         data = consume(fin)
+    assert consume(iter_lines(TEST_VECTOR.encode())) == data
+    assert unpack_data(pack_data(data)) == data
 
     total = sum(
         want for want, operands in data if validate(want, operands, VALID_OPS_1)
     )
     print("Test 1:", total)
     assert total == TEST_EXPECT_1
+    assert total == sum(
+        want for want, operands in data if solve_backward(want, operands, VALID_OPS_1)
+    )
+    flags = validate_batch(data, VALID_OPS_1)
+    assert total == sum(want for (want, _), ok in zip(data, flags) if ok)
 
     total = sum(
         want for want, operands in data if validate(want, operands, VALID_OPS_2)
     )
     print("Test 2:", total)
     assert total == TEST_EXPECT_2
+    assert total == sum(
+        want for want, operands in data if solve_backward(want, operands, VALID_OPS_2)
+    )
+    for max_frontier in (1, 1 << 20):
+        flags = validate_batch(data, VALID_OPS_2, max_frontier)
+        assert total == sum(want for (want, _), ok in zip(data, flags) if ok)
 
 
 def _main():
-    with open_puzzle_input() as fin:
-        data = consume(fin)
+    with timed("parse"):
+        data = cached_consume(consume, pack_data, unpack_data)
 
-    total = sum(
-        want for want, operands in data if validate(want, operands, VALID_OPS_1)
-    )
+    with timed("part1"):
+        total = sum(
+            want
+            for want, operands in data
+            if solve_backward(want, operands, VALID_OPS_1)
+        )
     print("Case 1:", total)
 
-    total = sum(
-        want for want, operands in data if validate(want, operands, VALID_OPS_2)
-    )
+    with timed("part2"):
+        total = sum(
+            want
+            for want, operands in data
+            if solve_backward(want, operands, VALID_OPS_2)
+        )
     print("Case 2:", total)
 
 
@@ -2,10 +2,13 @@ from __future__ import annotations
 
 import io
 import itertools
+import math
+import sys
 
+from array import array
 from typing import Final
 
-from aoc2024_common import Point, open_puzzle_input
+from aoc2024_common import Bounds, Point, PointArray, open_puzzle_input, timed
 
 TEST_VECTOR_1: Final[str] = """\
 ............
@@ -51,35 +54,146 @@ def consume(stream):
 def find_antinodes(dim_x, dim_y, antennae: dict[str, set[Point]]):
     antinodes: set[Point] = set()
     for channel, positions in antennae.items():
-        a1: Point
-        a2: Point
-        for a1, a2 in itertools.combinations(positions, 2):
-            shift = a2 - a1
-            an1 = a1 - shift
-            an2 = a2 + shift
-            if an1.within(dim_x, dim_y):
-                antinodes.add(an1)
-            if an2.within(dim_x, dim_y):
-                antinodes.add(an2)
+        pairs = list(itertools.combinations(positions, 2))
+        a1 = PointArray.from_points(a for a, _ in pairs)
+        a2 = PointArray.from_points(b for _, b in pairs)
+        shift = a2 - a1
+        for an in (a1 - shift, a2 + shift):
+            antinodes.update(itertools.compress(an, an.within(dim_x, dim_y)))
     return antinodes
 
 
 def find_antinodes2(dim_x, dim_y, antennae: dict[str, set[Point]]):
-    antinodes: set[Point] = set()
+    bounds = Bounds(dim_x, dim_y)
+    contains = bounds.contains
+    # Collect packed coordinates; cheaper to hash than Points
+    antinodes: set[int] = set()
     for channel, positions in antennae.items():
-        a1: Point
-        a2: Point
-        for a1, a2 in itertools.combinations(positions, 2):
-            shift = a2 - a1
-            an1 = a1
-            while an1.within(dim_x, dim_y):
-                antinodes.add(an1)
-                an1 = an1 - shift
-            an2 = a2
-            while an2.within(dim_x, dim_y):
-                antinodes.add(an2)
-                an2 = an2 + shift
-    return antinodes
+        for (x1, y1), (x2, y2) in itertools.combinations(positions, 2):
+            dx = x2 - x1
+            dy = y2 - y1
+            x, y = x1, y1
+            while contains(x, y):
+                antinodes.add(bounds.pack(x, y))
+                x -= dx
+                y -= dy
+            x, y = x2, y2
+            while contains(x, y):
+                antinodes.add(bounds.pack(x, y))
+                x += dx
+                y += dy
+    return {bounds.unpack(code) for code in antinodes}
+
+
+def _step_range(c: int, step: int, dim: int) -> tuple[int, int]:
+    """Range of k, inclusive, for which c + k*step stays within [0, dim)"""
+    if step > 0:
+        return -(c // step), (dim - 1 - c) // step
+    if step < 0:
+        return -((dim - 1 - c) // -step), c // -step
+    # Axis-aligned lines: this coordinate never changes, so the other one decides
+    return -sys.maxsize, sys.maxsize
+
+
+def _line_slice(x, y, dx, dy, dim_x, dim_y) -> tuple[int, int, int]:
+    """
+    (start, stop, step) of the flat indices of all grid cells on the line through (x, y)
+    with direction (dx, dy), in increasing order
+    """
+    g = math.gcd(dx, dy)
+    dx //= g
+    dy //= g
+    if dy < 0 or (dy == 0 and dx < 0):
+        dx, dy = -dx, -dy
+    lo_x, hi_x = _step_range(x, dx, dim_x)
+    lo_y, hi_y = _step_range(y, dy, dim_y)
+    lo = max(lo_x, lo_y)
+    step = dy * dim_x + dx
+    start = (y + lo * dy) * dim_x + x + lo * dx
+    return start, start + (min(hi_x, hi_y) - lo) * step + 1, step
+
+
+def rasterize_antinodes(dim_x, dim_y, antennae: dict[str, set[Point]]) -> bytearray:
+    """
+    Part 2 antinodes as a dim_x * dim_y occupancy grid, 1 marking an antinode. Each
+    pair's delta is reduced by its gcd, so every grid cell on the line is marked, and
+    the line is written with a single strided slice over its in-bounds span.
+    """
+    occ = bytearray(dim_x * dim_y)
+    ones = memoryview(b"\x01" * max(dim_x, dim_y))
+    for channel, positions in antennae.items():
+        for (x1, y1), (x2, y2) in itertools.combinations(positions, 2):
+            start, stop, step = _line_slice(x1, y1, x2 - x1, y2 - y1, dim_x, dim_y)
+            occ[start:stop:step] = ones[: (stop - start - 1) // step + 1]
+    return occ
+
+
+class AntinodeIndex:
+    """
+    Antinodes of a changing antenna map. Every cell keeps a count of the antenna pairs
+    that put an antinode on it, one count per part, so adding or removing an antenna
+    only touches the pairs it is part of. Part 2 uses gcd-reduced lines, as
+    rasterize_antinodes() does.
+    """
+
+    __slots__ = ("bounds", "antennae", "refs_1", "refs_2", "count_1", "count_2")
+
+    def __init__(self, dim_x: int, dim_y: int):
+        self.bounds = Bounds(dim_x, dim_y)
+        self.antennae: dict[str, set[Point]] = {}
+        self.refs_1 = array("L", bytes(array("L").itemsize * dim_x * dim_y))
+        self.refs_2 = array("L", self.refs_1)
+        # Number of cells with a nonzero count, i.e. the answer to each part
+        self.count_1 = 0
+        self.count_2 = 0
+
+    @classmethod
+    def from_antennae(cls, dim_x, dim_y, antennae: dict[str, set[Point]]):
+        index = cls(dim_x, dim_y)
+        for channel, positions in antennae.items():
+            for pos in positions:
+                index.add(channel, pos)
+        return index
+
+    def add(self, channel: str, pos: Point):
+        positions = self.antennae.setdefault(channel, set())
+        if pos in positions:
+            return
+        for other in positions:
+            self._update(pos, other, 1)
+        positions.add(pos)
+
+    def remove(self, channel: str, pos: Point):
+        positions = self.antennae[channel]
+        positions.remove(pos)
+        for other in positions:
+            self._update(pos, other, -1)
+        if not positions:
+            del self.antennae[channel]
+
+    def _update(self, a: Point, b: Point, delta: int):
+        bounds = self.bounds
+        (x1, y1), (x2, y2) = a, b
+        dx = x2 - x1
+        dy = y2 - y1
+        refs = self.refs_1
+        for x, y in ((x1 - dx, y1 - dy), (x2 + dx, y2 + dy)):
+            if bounds.contains(x, y):
+                self.count_1 += self._bump(refs, bounds.pack(x, y), delta)
+
+        refs = self.refs_2
+        line = _line_slice(x1, y1, dx, dy, bounds.width, bounds.height)
+        for i in range(*line):
+            self.count_2 += self._bump(refs, i, delta)
+
+    @staticmethod
+    def _bump(refs: array, i: int, delta: int) -> int:
+        """Apply delta to refs[i], returning the change in the number of live cells"""
+        before = refs[i]
+        refs[i] = before + delta
+        if before == 0:
+            return 1
+        return -1 if before == 1 and delta < 0 else 0
 
 
 def _test():
@@ -105,6 +219,17 @@ def _test():
     result = len(antinodes)
     print("Test 1-2:", result)
     assert result == TEST_EXPECT_1_2
+    occ = rasterize_antinodes(dim_x, dim_y, antennae)
+    assert occ.count(1) == TEST_EXPECT_1_2
+    assert {Point(i % dim_x, i // dim_x) for i, v in enumerate(occ) if v} == antinodes
+
+    index = AntinodeIndex.from_antennae(dim_x, dim_y, antennae)
+    assert (index.count_1, index.count_2) == (TEST_EXPECT_1_1, TEST_EXPECT_1_2)
+    index.remove("A", Point(9, 9))
+    index.add("0", Point(0, 0))
+    index.remove("0", Point(0, 0))
+    index.add("A", Point(9, 9))
+    assert (index.count_1, index.count_2) == (TEST_EXPECT_1_1, TEST_EXPECT_1_2)
 
     with io.StringIO(TEST_VECTOR_2) as fin:
         dim_x, dim_y, antennae = consume(fin)
@@ -116,15 +241,16 @@ def _test():
 
 
 def _main():
-    with open_puzzle_input() as fin:
+    with timed("parse"), open_puzzle_input() as fin:
         dim_x, dim_y, antennae = consume(fin)
 
-    antinodes = find_antinodes(dim_x, dim_y, antennae)
+    with timed("part1"):
+        antinodes = find_antinodes(dim_x, dim_y, antennae)
     result = len(antinodes)
     print("Case 1:", result)
 
-    antinodes = find_antinodes2(dim_x, dim_y, antennae)
-    result = len(antinodes)
+    with timed("part2"):
+        result = rasterize_antinodes(dim_x, dim_y, antennae).count(1)
     print("Case 2:", result)
 
 
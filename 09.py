@@ -1,13 +1,15 @@
 from __future__ import annotations
 
+import heapq
 import io
 import itertools
 import time
 
 from collections import deque
-from typing import Final
+from collections.abc import Iterable
+from typing import Final, NamedTuple
 
-from aoc2024_common import open_puzzle_input
+from aoc2024_common import open_puzzle_input, timed
 
 TEST_VECTOR: Final[str] = "2333133121414131402"
 TEST_EXPECT_1: Final[int] = 1928
@@ -105,6 +107,116 @@ def checksum(image: list[int | None]) -> int:
     return sum(n * fid for n, fid in enumerate(image) if fid is not None)
 
 
+class Span(NamedTuple):
+    fid: int
+    start: int
+    length: int
+
+
+def build_spans(rle: str | Iterable[int]) -> tuple[list[Span], list[tuple[int, int]]]:
+    """
+    The disk map as file spans and (start, length) gaps, both in disk order. A str is
+    read one digit per length; any other iterable supplies the lengths directly, so
+    they may be larger than 9.
+    """
+    lengths = map(int, rle) if isinstance(rle, str) else rle
+    files: list[Span] = []
+    gaps: list[tuple[int, int]] = []
+    pos = 0
+    for n, length in enumerate(lengths):
+        if not length:
+            continue
+        if n % 2 == 0:
+            files.append(Span(n // 2, pos, length))
+        # A zero-length file between two gaps leaves one larger gap
+        elif gaps and sum(gaps[-1]) == pos:
+            gaps[-1] = gaps[-1][0], gaps[-1][1] + length
+        else:
+            gaps.append((pos, length))
+        pos += length
+    return files, gaps
+
+
+def compact_spans(files: list[Span], gaps: list[tuple[int, int]]) -> list[Span]:
+    """compact_disk_image() on spans: the last blocks fill the first gaps"""
+    files = files.copy()
+    gaps = deque(gaps)
+    moved: list[Span] = []
+    while files and gaps:
+        gap_start, gap_length = gaps[0]
+        fid, start, length = files[-1]
+        if gap_start > start:
+            break
+        taken = min(gap_length, length)
+        moved.append(Span(fid, gap_start, taken))
+        if taken == length:
+            files.pop()
+        else:
+            files[-1] = Span(fid, start, length - taken)
+        if taken == gap_length:
+            gaps.popleft()
+        else:
+            gaps[0] = gap_start + taken, gap_length - taken
+    return files + moved
+
+
+class FreeSpace:
+    """
+    Gaps bucketed by size, each bucket a min-heap of gap starts, so the leftmost gap
+    that fits a file is found by looking at one heap top per size
+    """
+
+    __slots__ = ("heaps",)
+
+    def __init__(self, gaps: Iterable[tuple[int, int]]):
+        gaps = list(gaps)
+        self.heaps: list[list[int]] = [
+            [] for _ in range(max((length for _, length in gaps), default=0) + 1)
+        ]
+        for start, length in gaps:
+            self.heaps[length].append(start)
+        for heap in self.heaps:
+            heapq.heapify(heap)
+
+    def allocate(self, length: int, before: int) -> int | None:
+        """
+        Take length blocks from the leftmost gap that starts before `before` and is
+        large enough, returning where they start, or None if there is no such gap
+        """
+        heaps = self.heaps
+        best = before
+        best_size = 0
+        for size in range(length, len(heaps)):
+            if (heap := heaps[size]) and heap[0] < best:
+                best = heap[0]
+                best_size = size
+        if not best_size:
+            return None
+        heapq.heappop(heaps[best_size])
+        if rest := best_size - length:
+            heapq.heappush(heaps[rest], best + length)
+        return best
+
+
+def defrag_spans(files: list[Span], gaps: list[tuple[int, int]]) -> list[Span]:
+    """defrag_disk_image() on spans: whole files move to the first gap they fit"""
+    free = FreeSpace(gaps)
+    result: list[Span] = []
+    for fid, start, length in reversed(files):
+        if (dest := free.allocate(length, start)) is not None:
+            start = dest
+        result.append(Span(fid, start, length))
+    return result
+
+
+def span_checksum(spans: Iterable[Span]) -> int:
+    # Sum of fid * position over the span's positions, an arithmetic series
+    return sum(
+        fid * (start * length + length * (length - 1) // 2)
+        for fid, start, length in spans
+    )
+
+
 def _test():
     with io.StringIO(TEST_VECTOR) as fin:
         rle = consume(fin)
@@ -114,26 +226,30 @@ def _test():
     result = checksum(image2)
     print("Test 1:", result)
     assert result == TEST_EXPECT_1
+    assert span_checksum(compact_spans(*build_spans(rle))) == TEST_EXPECT_1
 
     image1 = build_disk_image(rle)
     image2 = defrag_disk_image(image1)
     result = checksum(image2)
     print("Test 2:", result)
     assert result == TEST_EXPECT_2
+    assert span_checksum(defrag_spans(*build_spans(rle))) == TEST_EXPECT_2
+    # Lengths past 9 have no single-digit encoding
+    files, gaps = build_spans([12, 0, 0, 10, 3])
+    assert files == [Span(0, 0, 12), Span(2, 22, 3)] and gaps == [(12, 10)]
+    assert span_checksum(defrag_spans(files, gaps)) == sum(range(12, 15)) * 2
 
 
 def _main():
-    with open_puzzle_input() as fin:
+    with timed("parse"), open_puzzle_input() as fin:
         rle = consume(fin)
 
-    image1 = build_disk_image(rle)
-    image2 = compact_disk_image(image1)
-    result = checksum(image2)
+    with timed("part1"):
+        result = span_checksum(compact_spans(*build_spans(rle)))
     print("Case 1:", result)
 
-    image1 = build_disk_image(rle)
-    image2 = defrag_disk_image(image1)
-    result = checksum(image2)
+    with timed("part2"):
+        result = span_checksum(defrag_spans(*build_spans(rle)))
     print("Case 2:", result)
 
 
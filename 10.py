@@ -2,10 +2,9 @@ from __future__ import annotations
 
 import io
 
-from functools import cache
 from typing import Final
 
-from aoc2024_common import Point, open_puzzle_input
+from aoc2024_common import Grid, Point, open_puzzle_input, timed
 
 TEST_VECTOR: Final[str] = """\
 89010123
@@ -21,45 +20,44 @@ TEST_EXPECT_1: Final[int] = 36
 TEST_EXPECT_2: Final[int] = 81
 
 
-DIRS = [
-    Point(0, -1),
-    Point(1, 0),
-    Point(0, 1),
-    Point(-1, 0),
-]
-
-
-@cache
 def _find_trail_recurse(
-    matrix: tuple[str, ...], so_far: tuple[Point, ...], max_val: int = 9
-) -> tuple[tuple[Point, ...], ...]:
-    cur_pos: Point = so_far[-1]
-    cur_val: int = int(cur_pos @ matrix)
+    grid: Grid,
+    pos: int,
+    memo: dict[int, tuple[tuple[int, ...], ...]],
+    max_val: int = ord("9"),
+) -> tuple[tuple[int, ...], ...]:
+    """
+    All trails, as flat grid indices, going from pos up to a cell of max_val. memo holds
+    the trails already found from each index, and belongs to a single grid.
+    """
+    if (known := memo.get(pos)) is not None:
+        return known
+    cur_val = grid[pos]
     if cur_val == max_val:
-        return (so_far,)
-    next_val = cur_val + 1
-    solutions = []
-    for _dir in DIRS:
-        try_pos = cur_pos + _dir
-        if (try_val_s := try_pos @ matrix) is None:
-            continue
-        if int(try_val_s) != next_val:
-            continue
-        next_trail = tuple(list(so_far) + [try_pos])
-        for solution in _find_trail_recurse(matrix, next_trail, max_val):
-            solutions.append(solution)
-    return tuple(set(solutions))
+        solutions = [(pos,)]
+    else:
+        next_val = cur_val + 1
+        solutions = []
+        for _dir in grid.dirs4:
+            # The padding never holds a digit so no bounds check is needed
+            if grid[try_pos := pos + _dir] != next_val:
+                continue
+            for solution in _find_trail_recurse(grid, try_pos, memo, max_val):
+                solutions.append((pos,) + solution)
+    memo[pos] = result = tuple(solutions)
+    return result
 
 
 def find_trails(matrix: tuple[str, ...]) -> dict[Point, list[tuple[Point, ...]]]:
-    trails = []
-    for y, ln in enumerate(matrix):
-        for x, c in enumerate(ln):
-            if c == "0":
-                trails.extend(_find_trail_recurse(matrix, (Point(x, y),)))
+    grid = Grid.from_lines(matrix)
+    memo: dict[int, tuple[tuple[int, ...], ...]] = {}
     trails_by_head = {}
-    for t in trails:
-        trails_by_head.setdefault(t[0], []).append(t)
+    for head in grid.find_all(ord("0")):
+        # Heads without any trail are left out
+        if trails := _find_trail_recurse(grid, head, memo):
+            trails_by_head[grid.point(head)] = [
+                tuple(grid.point(idx) for idx in t) for t in trails
+            ]
     return trails_by_head
 
 
@@ -97,15 +95,16 @@ def _test():
 
 
 def _main():
-    with open_puzzle_input() as fin:
+    with timed("parse"), open_puzzle_input() as fin:
         data = consume(fin)
 
-    trails = find_trails(data)
-
-    result = sum(calc_trailscore(t) for t in trails.values())
+    with timed("part1"):
+        trails = find_trails(data)
+        result = sum(calc_trailscore(t) for t in trails.values())
     print("Case 1:", result)
 
-    result = sum(calc_trailrating(t) for t in trails.values())
+    with timed("part2"):
+        result = sum(calc_trailrating(t) for t in trails.values())
     print("Case 1:", result)
 
 
@@ -5,7 +5,7 @@ import io
 from functools import cache
 from typing import Final
 
-from aoc2024_common import open_puzzle_input
+from aoc2024_common import open_puzzle_input, timed
 
 TEST_VECTOR_1: Final[str] = """\
 0 1 10 99 999
@@ -97,11 +97,12 @@ def _test():
 
 
 def _main():
-    with open_puzzle_input() as fin:
+    with timed("parse"), open_puzzle_input() as fin:
         data = consume(fin)
 
-    mutated = mutate(data, 25)
-    result = len(mutated)
+    with timed("part1"):
+        mutated = mutate(data, 25)
+        result = len(mutated)
     print("Case 1:", result)
     del mutated
 
@@ -109,7 +110,8 @@ def _main():
     # result = len(mutated)
     # print("Case 2:", result)
     # del mutated
-    result = sum(count_mutations(seed, 75) for seed in data)
+    with timed("part2"):
+        result = sum(count_mutations(seed, 75) for seed in data)
     print("Case 2:", result)
 
 
@@ -11,7 +11,7 @@ from collections.abc import Callable
 from enum import Enum, auto
 from typing import Final
 
-from aoc2024_common import Point, open_puzzle_input
+from aoc2024_common import Grid, Point, open_puzzle_input, timed
 
 TEST_VECTOR_1: Final[str] = """\
 OOOOO
@@ -64,25 +64,25 @@ DIRS: Final[list[Point]] = [Point(1, 0), Point(0, 1), Point(-1, 0), Point(0, -1)
 
 
 def patches_by_species(matrix: list[str]) -> dict[str, list[set[Point]]]:
-    garden: list[list[str | None]] = [list(row) for row in matrix]
+    grid = Grid.from_lines(matrix)
+    data = grid.data
     patches: dict[str, list[set[Point]]] = {}
 
-    def _get_connected(spc: str, coord: Point) -> list:
-        if (_s := coord @ garden) is None or _s != spc:
-            return []
-        garden[coord.y][coord.x] = None
-        result = [coord]
-        for _dir in DIRS:
-            result.extend(_get_connected(spc, coord + _dir))
-        return result
-
-    for y, row in enumerate(garden):
-        for x, species in enumerate(row):
-            if species is None:
-                continue
-            patches.setdefault(species, []).append(
-                set(_get_connected(species, Point(x, y)))
-            )
+    for start in grid.cells():
+        if not (spc := data[start]):
+            continue
+        # Flood fill, clearing each cell as it gets claimed by the patch
+        data[start] = 0
+        stack = [start]
+        patch = set()
+        while stack:
+            idx = stack.pop()
+            patch.add(grid.point(idx))
+            for _dir in grid.dirs4:
+                if data[nxt := idx + _dir] == spc:
+                    data[nxt] = 0
+                    stack.append(nxt)
+        patches.setdefault(chr(spc), []).append(patch)
 
     return patches
 
@@ -157,15 +157,21 @@ CORNER_DIRS: dict[CornerType, dict[Point, Callable[[str, str], bool]]] = {
 
 
 def find_corners(matrix: list[str], all_patches: dict[str, list[set[Point]]]):
+    grid = Grid.from_lines(matrix)
+    data = grid.data
+    origin = grid.index(0, 0)
+    corner_offsets = [
+        (ctype, [(grid.index(*delta) - origin, test) for delta, test in ctests.items()])
+        for ctype, ctests in CORNER_DIRS.items()
+    ]
     corners: dict[str, dict[Point, list[CornerType]]] = {}
     for species, patches in all_patches.items():
+        spc = ord(species)
         pos: Point
         for pos in itertools.chain.from_iterable(patches):
-            for ctype, ctests in CORNER_DIRS.items():
-                if all(
-                    test(species, (pos + delta) @ matrix)
-                    for delta, test in ctests.items()
-                ):
+            idx = grid.index(*pos)
+            for ctype, ctests in corner_offsets:
+                if all(test(spc, data[idx + offset]) for offset, test in ctests):
                     # print(f"{pos} {ctype}")
                     corners.setdefault(species, {}).setdefault(pos, []).append(ctype)
     return corners
@@ -226,15 +232,17 @@ def _test():
 
 
 def _main():
-    with open_puzzle_input() as fin:
+    with timed("parse"), open_puzzle_input() as fin:
         data = consume(fin)
-    plots = patches_by_species(data)
 
-    result = sum(calc_price(coverage) for coverage in plots.values())
+    with timed("part1"):
+        plots = patches_by_species(data)
+        result = sum(calc_price(coverage) for coverage in plots.values())
     print("Case 1:", result)
 
-    all_corners = find_corners(data, plots)
-    result = calc_price2(plots, all_corners)
+    with timed("part2"):
+        all_corners = find_corners(data, plots)
+        result = calc_price2(plots, all_corners)
     print("Case 2:", result)
 
 
@@ -1,11 +1,13 @@
 from __future__ import annotations
 
 import io
+import itertools
 import re
 
+from array import array
 from typing import Protocol, SupportsInt
 
-from aoc2024_common import open_puzzle_input
+from aoc2024_common import cached_consume, iter_lines, pattern_for, timed
 
 # a1.x + b1.y + c1 = 0
 # a2.x + b2.y + c2 = 0
@@ -94,11 +96,11 @@ def consume(stream):
     for ln in stream:
         if not (ln := ln.strip()):
             continue
-        if m := RE_BUTTON.match(ln):
+        if m := pattern_for(RE_BUTTON, ln).match(ln):
             bdx.append(int(m.group("dx")))
             bdy.append(int(m.group("dy")))
             continue
-        if m := RE_PRIZE.match(ln):
+        if m := pattern_for(RE_PRIZE, ln).match(ln):
             data.append(
                 (bdx[0], bdx[1], int(m.group("x")), bdy[0], bdy[1], int(m.group("y")))
             )
@@ -109,6 +111,15 @@ def consume(stream):
     return data
 
 
+def pack_data(data: list[tuple[int, int, int, int, int, int]]) -> dict[str, array]:
+    return {"machines": array("q", itertools.chain.from_iterable(data))}
+
+
+def unpack_data(arrays: dict[str, array]) -> list[tuple[int, int, int, int, int, int]]:
+    flat = iter(arrays["machines"])
+    return list(zip(flat, flat, flat, flat, flat, flat))
+
+
 def _test():
     for a1, b1, nc1, a2, b2, nc2, expect in TEST_SOLVER_EXPECT:
         result = aoc_solve(a1, b1, nc1, a2, b2, nc2)
@@ -116,6 +127,8 @@ def _test():
 
     with io.StringIO(TEST_VECTOR) as fin:
         data = consume(fin)
+    assert consume(iter_lines(TEST_VECTOR.encode())) == data
+    assert unpack_data(pack_data(data)) == data
 
     total = 0
     for item in data:
@@ -130,27 +143,29 @@ def _test():
 
 
 def _main():
-    with open_puzzle_input() as fin:
-        data = consume(fin)
-
-    total = 0
-    for item in data:
-        result = aoc_solve(*item)
-        if result is None:
-            continue
-        x, y = result
-        # print(x, y)
-        total += 3 * x + 1 * y
+    with timed("parse"):
+        data = cached_consume(consume, pack_data, unpack_data)
+
+    with timed("part1"):
+        total = 0
+        for item in data:
+            result = aoc_solve(*item)
+            if result is None:
+                continue
+            x, y = result
+            # print(x, y)
+            total += 3 * x + 1 * y
     print("Case 1:", total)
 
-    total = 0
-    for item in data:
-        result = aoc_solve2(*item)
-        if result is None:
-            continue
-        x, y = result
-        # print(x, y)
-        total += 3 * x + 1 * y
+    with timed("part2"):
+        total = 0
+        for item in data:
+            result = aoc_solve2(*item)
+            if result is None:
+                continue
+            x, y = result
+            # print(x, y)
+            total += 3 * x + 1 * y
     print("Case 2:", total)
 
 
@@ -4,9 +4,17 @@ import io
 import math
 import re
 
+from array import array
 from typing import NamedTuple
 
-from aoc2024_common import Point, open_puzzle_input
+from aoc2024_common import (
+    Point,
+    PointArray,
+    cached_consume,
+    iter_lines,
+    pattern_for,
+    timed,
+)
 
 TEST_VECTORa = """\
 p=0,4 v=3,-3
@@ -51,6 +59,13 @@ def final_location(
     return final_pos
 
 
+def final_location_array(
+    starts: PointArray, velos: PointArray, dimension: Point, time_passed: int
+) -> PointArray:
+    """Batch version of final_location() on the robots' start and velocity columns"""
+    return (starts + velos * time_passed) % dimension
+
+
 def count_quadrant(final_pos: list[Point], dimension: Point):
     mid_x = dimension.x // 2
     mid_y = dimension.y // 2
@@ -133,7 +148,7 @@ def consume(stream):
     for ln in stream:
         if not (ln := ln.strip()):
             continue
-        if not (m := RE_PARSER.match(ln)):
+        if not (m := pattern_for(RE_PARSER, ln).match(ln)):
             raise ValueError(f"Cannot parse {ln!r}")
         data.append(
             Robot(
@@ -144,12 +159,32 @@ def consume(stream):
     return data
 
 
+def pack_data(data: list[Robot]) -> dict[str, array]:
+    return {
+        "sx": array("q", (r.start.x for r in data)),
+        "sy": array("q", (r.start.y for r in data)),
+        "vx": array("q", (r.velo.x for r in data)),
+        "vy": array("q", (r.velo.y for r in data)),
+    }
+
+
+def unpack_data(arrays: dict[str, array]) -> list[Robot]:
+    starts = map(Point, arrays["sx"], arrays["sy"])
+    velos = map(Point, arrays["vx"], arrays["vy"])
+    return list(map(Robot, starts, velos))
+
+
 def _test():
     with io.StringIO(TEST_VECTORa) as fin:
         data = consume(fin)
+    assert consume(iter_lines(TEST_VECTORa.encode())) == data
+    assert unpack_data(pack_data(data)) == data
 
     dimension = Point(*TEST_VECTORb)
     final_pos = final_location(data, dimension, 100)
+    starts = PointArray.from_points(r.start for r in data)
+    velos = PointArray.from_points(r.velo for r in data)
+    assert final_location_array(starts, velos, dimension, 100).to_points() == final_pos
     count = count_quadrant(final_pos, dimension)
     print(f"Quadrants: {count}", f"should be {TEST_EXPECT_2}")
     assert count == TEST_EXPECT_2
@@ -161,25 +196,29 @@ def _test():
 
 
 def _main():
-    with open_puzzle_input() as fin:
-        data = consume(fin)
+    with timed("parse"):
+        data = cached_consume(consume, pack_data, unpack_data)
 
     dimension = Point(101, 103)
-    final_pos = final_location(data, dimension, 100)
-    count = count_quadrant(final_pos, dimension)
+    with timed("part1"):
+        final_pos = final_location(data, dimension, 100)
+        count = count_quadrant(final_pos, dimension)
     print(f"Quadrants: {count}")
     safety = math.prod(count)
     print("Safety factor:", safety)
 
     print("Looking for Christmas Tree ...", end=".", flush=True)
-    count = 0
-    while True:
-        count += 1
-        if (count % 100) == 0:
-            print(".", end="", flush=True)
-        final_pos = final_location(data, dimension, count)
-        if has_christmas_tree2(final_pos, dimension):
-            break
+    with timed("part2"):
+        starts = PointArray.from_points(r.start for r in data)
+        velos = PointArray.from_points(r.velo for r in data)
+        count = 0
+        while True:
+            count += 1
+            if (count % 100) == 0:
+                print(".", end="", flush=True)
+            final_pos = final_location_array(starts, velos, dimension, count)
+            if has_christmas_tree2(final_pos.pairs(), dimension):
+                break
     print("\nChristmas Tree possibly seen at", count)
 
 
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+import traceback
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+
+from aoc2024_common import (
+    WORKERS_ENV,
+    day_script,
+    discover_days,
+    enable_timing,
+    load_day,
+)
+
+
+class DayResult(NamedTuple):
+    day: str
+    ok: bool
+    wall: float
+    output: str
+    error: str | None = None
+
+
+def run_day(
+    day: str,
+    with_tests: bool = False,
+    timing: str | None = None,
+    day_workers: int | None = None,
+) -> DayResult:
+    """
+    Run one day's _test() (optionally) and _main(), capturing everything it prints.
+    day_workers caps the worker processes the day itself may start.
+    """
+    path = day_script(day)
+    if timing is not None:
+        enable_timing(timing)
+    if day_workers is not None:
+        os.environ[WORKERS_ENV] = str(day_workers)
+    # open_puzzle_input() locates the input file through the running script's name
+    sys.argv = [str(path)]
+    buf = io.StringIO()
+    error = None
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(buf):
+            module = load_day(day)
+            if with_tests:
+                module._test()
+            module._main()
+    except Exception as e:
+        error = "".join(traceback.format_exception_only(e)).strip()
+    wall = time.perf_counter() - start
+    return DayResult(path.stem, error is None, wall, buf.getvalue(), error)
+
+
+def run_days(
+    days: list[str],
+    with_tests: bool = False,
+    workers: int | None = None,
+    timing: str | None = None,
+) -> list[DayResult]:
+    """
+    Run the selected days concurrently, one process per day, in day order. The CPUs are
+    split between the day processes, so a day that starts a pool of its own does not
+    multiply the process count.
+    """
+    if not days:
+        return []
+    cpus = os.cpu_count() or 1
+    workers = min(workers or cpus, len(days))
+    day_workers = max(1, cpus // workers)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(run_day, day, with_tests, timing, day_workers) for day in days
+        ]
+        return [f.result() for f in futures]
+
+
+def format_table(results: list[DayResult], total_wall: float) -> str:
+    lines = [f"{'Day':>3}  {'Status':<6}  {'Wall (s)':>9}", "-" * 22]
+    for r in results:
+        lines.append(f"{r.day:>3}  {'OK' if r.ok else 'FAIL':<6}  {r.wall:>9.3f}")
+    lines.append("-" * 22)
+    lines.append(f"{'All':>3}  {'':<6}  {total_wall:>9.3f}")
+    return "\n".join(lines)
+
+
+def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Run Advent of Code 2024 days in parallel"
+    )
+    parser.add_argument(
+        "days", nargs="*", help="Days to run, e.g. 01 6 14 (default: all)"
+    )
+    parser.add_argument(
+        "-t", "--tests", action="store_true", help="Also run each day's self-tests"
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        help="Worker processes (default: CPU count)",
+    )
+    parser.add_argument(
+        "--timing",
+        metavar="PATH",
+        default=None,
+        help="Append per-stage timings as JSON lines to PATH ('-' for stderr)",
+    )
+    parser.add_argument(
+        "-q", "--quiet", action="store_true", help="Only print the result table"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _parse_args(argv)
+    available = discover_days()
+    days = [f"{int(d):02d}" for d in args.days] if args.days else available
+    if unknown := [d for d in days if d not in available]:
+        print(f"Unknown day(s): {', '.join(unknown)}", file=sys.stderr)
+        return 2
+
+    start = time.perf_counter()
+    results = run_days(
+        days, with_tests=args.tests, workers=args.jobs, timing=args.timing
+    )
+    total_wall = time.perf_counter() - start
+
+    for r in results:
+        if not args.quiet:
+            print(f"===== Day {r.day} =====")
+            print(r.output, end="")
+        if r.error is not None:
+            print(f"!!!!! Day {r.day} failed: {r.error}")
+    print(format_table(results, total_wall))
+    return 0 if all(r.ok for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,571 @@
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import itertools
+import math
+import operator
+import random
+import statistics
+import string
+import sys
+import time
+
+from collections.abc import Callable
+from types import ModuleType
+from typing import Any, NamedTuple
+
+from aoc2024_common import discover_days, load_day
+
+DEFAULT_SCALES: tuple[int, ...] = (1, 10, 100)
+
+
+class BenchStage(NamedTuple):
+    name: str
+    run: Callable[[Any], Any]
+    max_scale: int | None = None
+
+
+class BenchCase(NamedTuple):
+    # Produces a synthetic puzzle input roughly `scale` times the size of a real one
+    generate: Callable[[int, random.Random], str]
+    # Entry points to time, each called with the output of the day's consume()
+    stages: Callable[[ModuleType], list[BenchStage]]
+
+
+class BenchResult(NamedTuple):
+    day: str
+    stage: str
+    scale: int
+    input_bytes: int
+    median: float
+    p95: float
+
+    @property
+    def throughput(self) -> float:
+        """Input bytes processed per second"""
+        return self.input_bytes / self.median if self.median else math.inf
+
+
+def _side(base: int, scale: int) -> int:
+    # Grids grow in both dimensions, so scale the area rather than the side
+    return max(2, round(base * math.sqrt(scale)))
+
+
+def _grid(rng: random.Random, side: int, cells: str, weights=None) -> str:
+    return "".join(
+        "".join(rng.choices(cells, weights, k=side)) + "\n" for _ in range(side)
+    )
+
+
+# region Generators
+
+
+def _gen_01(scale: int, rng: random.Random) -> str:
+    return "".join(
+        f"{rng.randrange(10000, 100000)}   {rng.randrange(10000, 100000)}\n"
+        for _ in range(1000 * scale)
+    )
+
+
+def _gen_02(scale: int, rng: random.Random) -> str:
+    lines = []
+    for _ in range(1000 * scale):
+        sign = rng.choice((-1, 1))
+        level = rng.randrange(10, 90)
+        seq = [level]
+        for _ in range(rng.randrange(4, 8)):
+            # Mostly well-behaved steps, occasionally a bad one
+            step = rng.choice((1, 2, 3, 1, 2, 3, 0, 5))
+            level += sign * step
+            seq.append(level)
+        lines.append(" ".join(map(str, seq)) + "\n")
+    return "".join(lines)
+
+
+def _gen_03(scale: int, rng: random.Random) -> str:
+    tokens = []
+    for _ in range(700 * scale):
+        tokens.append("".join(rng.choices(string.punctuation + "mulodn't ", k=15)))
+        match rng.randrange(10):
+            case 0:
+                tokens.append("do()")
+            case 1:
+                tokens.append("don't()")
+            case _:
+                tokens.append(f"mul({rng.randrange(1000)},{rng.randrange(1000)})")
+    text = "".join(tokens)
+    return "".join(text[i : i + 3000] + "\n" for i in range(0, len(text), 3000))
+
+
+def _gen_04(scale: int, rng: random.Random) -> str:
+    return _grid(rng, _side(140, scale), "XMAS")
+
+
+def _gen_05(scale: int, rng: random.Random) -> str:
+    pages = rng.sample(range(10, 100), 49)
+    rules = [
+        f"{pages[i]}|{pages[j]}\n"
+        for i in range(len(pages))
+        for j in range(i + 1, len(pages))
+    ]
+    rng.shuffle(rules)
+    updates = []
+    for _ in range(200 * scale):
+        upd = rng.sample(pages, rng.randrange(5, 24, 2))
+        if rng.random() < 0.5:
+            upd.sort(key=pages.index)
+        updates.append(",".join(map(str, upd)) + "\n")
+    return "".join(rules) + "\n" + "".join(updates)
+
+
+def _gen_06(scale: int, rng: random.Random) -> str:
+    side = _side(130, scale)
+    rows = [["."] * side for _ in range(side)]
+    # Obstructions that turn the guard into an outward spiral, arms `gap` cells apart,
+    # so the patrol covers about a third of the map (like real inputs) and leaves it
+    gap = 3
+    x = y = side // 2
+    rows[y][x] = "^"
+    path = {(x, y)}
+    dirs = [(0, -1), (1, 0), (0, 1), (-1, 0)]
+    for arm in itertools.count(2):
+        dx, dy = dirs[(arm - 2) % 4]
+        for _ in range(gap * (arm // 2)):
+            x, y = x + dx, y + dy
+            if not (0 <= x < side and 0 <= y < side):
+                break
+            path.add((x, y))
+        else:
+            if 0 <= x + dx < side and 0 <= y + dy < side:
+                rows[y + dy][x + dx] = "#"
+            continue
+        break
+    # Scatter more off the route, which leaves the patrol alone
+    for y, row in enumerate(rows):
+        for x in range(side):
+            if (x, y) not in path and rng.random() < 0.02:
+                row[x] = "#"
+    return "".join("".join(row) + "\n" for row in rows)
+
+
+def _gen_07(scale: int, rng: random.Random) -> str:
+    ops = (operator.add, operator.mul, lambda a, b: int(f"{a}{b}"))
+    lines = []
+    for _ in range(850 * scale):
+        operands = [rng.randrange(1, 100) for _ in range(rng.randrange(2, 8))]
+        want = operands[0]
+        for b in operands[1:]:
+            want = rng.choice(ops)(want, b)
+        if rng.random() < 0.5:
+            want += 1
+        lines.append(f"{want}: {' '.join(map(str, operands))}\n")
+    return "".join(lines)
+
+
+def _gen_08(scale: int, rng: random.Random) -> str:
+    side = _side(50, scale)
+    rows = [["."] * side for _ in range(side)]
+    freqs = string.ascii_letters + string.digits
+    for _ in range(200 * scale):
+        rows[rng.randrange(side)][rng.randrange(side)] = rng.choice(freqs)
+    return "".join("".join(row) + "\n" for row in rows)
+
+
+def _gen_09(scale: int, rng: random.Random) -> str:
+    digits = [
+        rng.randrange(1, 10) if n % 2 == 0 else rng.randrange(10)
+        for n in range(19999 * scale)
+    ]
+    return "".join(map(str, digits)) + "\n"
+
+
+def _gen_10(scale: int, rng: random.Random) -> str:
+    side = _side(50, scale)
+    # Smooth-ish terrain so that there are trails to find
+    return "".join(
+        "".join(str((x + y + rng.randrange(3)) % 10) for x in range(side)) + "\n"
+        for y in range(side)
+    )
+
+
+def _gen_11(scale: int, rng: random.Random) -> str:
+    return " ".join(str(rng.randrange(10**7)) for _ in range(8 * scale)) + "\n"
+
+
+def _gen_12(scale: int, rng: random.Random) -> str:
+    side = _side(140, scale)
+    blocks = {}
+    rows = []
+    for y in range(side):
+        row = []
+        for x in range(side):
+            key = x // 5, y // 5
+            if key not in blocks:
+                blocks[key] = rng.choice(string.ascii_uppercase)
+            row.append(blocks[key] if rng.random() < 0.9 else rng.choice("XYZ"))
+        rows.append("".join(row) + "\n")
+    return "".join(rows)
+
+
+def _gen_13(scale: int, rng: random.Random) -> str:
+    machines = []
+    for _ in range(320 * scale):
+        ax, ay, bx, by = (rng.randrange(10, 100) for _ in range(4))
+        px, py = rng.randrange(1000, 20000), rng.randrange(1000, 20000)
+        machines.append(
+            f"Button A: X+{ax}, Y+{ay}\n"
+            f"Button B: X+{bx}, Y+{by}\n"
+            f"Prize: X={px}, Y={py}\n\n"
+        )
+    return "".join(machines)
+
+
+def _gen_14(scale: int, rng: random.Random) -> str:
+    return "".join(
+        f"p={rng.randrange(101)},{rng.randrange(103)} "
+        f"v={rng.randrange(-100, 101)},{rng.randrange(-100, 101)}\n"
+        for _ in range(500 * scale)
+    )
+
+
+# endregion
+
+# region Stages
+
+
+def _stages_01(m: ModuleType) -> list[BenchStage]:
+    return [
+        BenchStage("calculate_1", lambda d: m.calculate_1(*d)),
+        BenchStage("calculate_2", lambda d: m.calculate_2(*d)),
+        BenchStage("calculate_1_fast", lambda d: m.calculate_1_fast(*d)),
+        BenchStage("calculate_2_fast", lambda d: m.calculate_2_fast(*d)),
+    ]
+
+
+def _stages_02(m: ModuleType) -> list[BenchStage]:
+    return [
+        BenchStage("check_safe_1", lambda d: sum(m.check_safe_1(s) for s in d)),
+        BenchStage("check_safe_2", lambda d: sum(m.check_safe_2(s) for s in d)),
+        BenchStage("count_safe", m.count_safe),
+    ]
+
+
+def _stages_03(m: ModuleType) -> list[BenchStage]:
+    return [
+        BenchStage("calculate_1", m.calculate_1),
+        BenchStage("calculate_2", m.calculate_2),
+        BenchStage("scan_stream", lambda d: m.scan_stream(io.BytesIO(d.encode()))),
+    ]
+
+
+def _stages_04(m: ModuleType) -> list[BenchStage]:
+    return [
+        BenchStage("count_xmas", m.count_xmas),
+        BenchStage("count_crossmas", m.count_crossmas),
+        BenchStage("count_word", m.count_word),
+        BenchStage("count_cross", m.count_cross),
+    ]
+
+
+def _stages_05(m: ModuleType) -> list[BenchStage]:
+    return [
+        BenchStage("check_1", lambda d: m.check_1(*d)),
+        BenchStage("check_2", lambda d: m.check_2(d[0], [ln.copy() for ln in d[1]])),
+    ]
+
+
+def _stages_06(m: ModuleType) -> list[BenchStage]:
+    return [
+        BenchStage("walk_map", lambda d: m.walk_map(*d)),
+        BenchStage("walk_map_fast", lambda d: m.walk_map_fast(*d)),
+        BenchStage("create_loop", lambda d: m.create_loop(*d)),
+    ]
+
+
+def _stages_07(m: ModuleType) -> list[BenchStage]:
+    def _total(data, ops, check=m.validate):
+        return sum(want for want, operands in data if check(want, operands, ops))
+
+    return [
+        BenchStage("validate_1", lambda d: _total(d, m.VALID_OPS_1)),
+        BenchStage("validate_2", lambda d: _total(d, m.VALID_OPS_2), max_scale=10),
+        BenchStage(
+            "solve_backward_1", lambda d: _total(d, m.VALID_OPS_1, m.solve_backward)
+        ),
+        BenchStage(
+            "solve_backward_2", lambda d: _total(d, m.VALID_OPS_2, m.solve_backward)
+        ),
+        BenchStage("validate_batch_1", lambda d: m.validate_batch(d, m.VALID_OPS_1)),
+        BenchStage("validate_batch_2", lambda d: m.validate_batch(d, m.VALID_OPS_2)),
+    ]
+
+
+def _stages_08(m: ModuleType) -> list[BenchStage]:
+    return [
+        BenchStage("find_antinodes", lambda d: m.find_antinodes(*d)),
+        BenchStage("find_antinodes2", lambda d: m.find_antinodes2(*d)),
+        BenchStage("rasterize_antinodes", lambda d: m.rasterize_antinodes(*d).count(1)),
+    ]
+
+
+def _stages_09(m: ModuleType) -> list[BenchStage]:
+    return [
+        BenchStage("build_disk_image", m.build_disk_image),
+        BenchStage(
+            "compact_disk_image",
+            lambda d: m.checksum(m.compact_disk_image(m.build_disk_image(d))),
+            max_scale=10,
+        ),
+        BenchStage(
+            "defrag_disk_image",
+            lambda d: m.checksum(m.defrag_disk_image(m.build_disk_image(d))),
+            max_scale=10,
+        ),
+        BenchStage("build_spans", m.build_spans),
+        BenchStage(
+            "compact_spans",
+            lambda d: m.span_checksum(m.compact_spans(*m.build_spans(d))),
+        ),
+        BenchStage(
+            "defrag_spans",
+            lambda d: m.span_checksum(m.defrag_spans(*m.build_spans(d))),
+        ),
+    ]
+
+
+def _stages_10(m: ModuleType) -> list[BenchStage]:
+    return [BenchStage("find_trails", m.find_trails)]
+
+
+def _stages_11(m: ModuleType) -> list[BenchStage]:
+    def _count(d):
+        m.count_mutations.cache_clear()
+        return sum(m.count_mutations(seed, 75) for seed in d)
+
+    return [
+        BenchStage("mutate_25", lambda d: len(m.mutate(d, 25)), max_scale=10),
+        BenchStage("count_mutations_75", _count),
+    ]
+
+
+def _stages_12(m: ModuleType) -> list[BenchStage]:
+    def _price2(d):
+        plots = m.patches_by_species(d)
+        return m.calc_price2(plots, m.find_corners(d, plots))
+
+    return [
+        BenchStage("patches_by_species", m.patches_by_species),
+        BenchStage("calc_price2", _price2),
+    ]
+
+
+def _stages_13(m: ModuleType) -> list[BenchStage]:
+    return [
+        BenchStage("aoc_solve", lambda d: [m.aoc_solve(*item) for item in d]),
+        BenchStage("aoc_solve2", lambda d: [m.aoc_solve2(*item) for item in d]),
+    ]
+
+
+def _stages_14(m: ModuleType) -> list[BenchStage]:
+    dimension = m.Point(101, 103)
+
+    def _final_array(d):
+        starts = m.PointArray.from_points(r.start for r in d)
+        velos = m.PointArray.from_points(r.velo for r in d)
+        return m.final_location_array(starts, velos, dimension, 100)
+
+    def _quadrants(d):
+        return m.count_quadrant(m.final_location(d, dimension, 100), dimension)
+
+    return [
+        BenchStage("final_location", lambda d: m.final_location(d, dimension, 100)),
+        BenchStage("final_location_array", _final_array),
+        BenchStage("count_quadrant", _quadrants),
+    ]
+
+
+# endregion
+
+BENCH_CASES: dict[str, BenchCase] = {
+    "01": BenchCase(_gen_01, _stages_01),
+    "02": BenchCase(_gen_02, _stages_02),
+    "03": BenchCase(_gen_03, _stages_03),
+    "04": BenchCase(_gen_04, _stages_04),
+    "05": BenchCase(_gen_05, _stages_05),
+    "06": BenchCase(_gen_06, _stages_06),
+    "07": BenchCase(_gen_07, _stages_07),
+    "08": BenchCase(_gen_08, _stages_08),
+    "09": BenchCase(_gen_09, _stages_09),
+    "10": BenchCase(_gen_10, _stages_10),
+    "11": BenchCase(_gen_11, _stages_11),
+    "12": BenchCase(_gen_12, _stages_12),
+    "13": BenchCase(_gen_13, _stages_13),
+    "14": BenchCase(_gen_14, _stages_14),
+}
+
+
+def measure(
+    func: Callable[[], Any], repeat: int, warmup: int = 1
+) -> tuple[float, float]:
+    """
+    Run func `warmup` times untimed, so that imports, caches and allocator growth are
+    out of the way, then `repeat` times, returning the (median, p95) wall time in
+    seconds
+    """
+    for _ in range(warmup):
+        func()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return summarize_timings(timings)
+
+
+def summarize_timings(timings: list[float]) -> tuple[float, float]:
+    """(median, p95) of timings; p95 is nearest-rank, so always one of the samples"""
+    ordered = sorted(timings)
+    return statistics.median(ordered), ordered[math.ceil(0.95 * len(ordered)) - 1]
+
+
+def scaling_exponent(results: list[BenchResult]) -> float | None:
+    """
+    Least-squares slope of log(time) against log(input size). Roughly 1.0 means linear,
+    2.0 means quadratic.
+    """
+    points = [
+        (math.log(r.input_bytes), math.log(r.median)) for r in results if r.median > 0
+    ]
+    if len(points) < 2:
+        return None
+    mean_x = statistics.fmean(x for x, _ in points)
+    mean_y = statistics.fmean(y for _, y in points)
+    denom = sum((x - mean_x) ** 2 for x, _ in points)
+    if not denom:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / denom
+
+
+def bench_day(
+    day: str,
+    scales: tuple[int, ...] = DEFAULT_SCALES,
+    repeat: int = 5,
+    budget: float = 10.0,
+    seed: int = 2024,
+) -> list[BenchResult]:
+    """
+    Benchmark consume() and each registered entry point of a day at every scale. A stage
+    whose median exceeds `budget` seconds is not run at the larger scales.
+    """
+    module = load_day(day)
+    case = BENCH_CASES[day]
+    stages = [BenchStage("consume", lambda d: d)] + case.stages(module)
+    over_budget: set[str] = set()
+    results: list[BenchResult] = []
+    for scale in scales:
+        text = case.generate(scale, random.Random(seed))
+        nbytes = len(text.encode())
+
+        def _consume():
+            with io.StringIO(text) as fin:
+                return module.consume(fin)
+
+        # Entry points may print progress; keep the report readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            data = _consume()
+            for stage in stages:
+                if stage.name in over_budget:
+                    continue
+                if stage.max_scale is not None and scale > stage.max_scale:
+                    continue
+                if stage.name == "consume":
+                    func = _consume
+                else:
+                    func = (lambda _s: lambda: _s.run(data))(stage)
+                median, p95 = measure(func, repeat)
+                results.append(BenchResult(day, stage.name, scale, nbytes, median, p95))
+                if median > budget:
+                    over_budget.add(stage.name)
+    return results
+
+
+def format_report(results: list[BenchResult]) -> str:
+    header = (
+        f"{'Day':>3}  {'Stage':<20}  {'Scale':>5}  {'Bytes':>10}  "
+        f"{'Median (s)':>10}  {'p95 (s)':>10}  {'MB/s':>8}  {'Exp':>5}"
+    )
+    lines = [header, "-" * len(header)]
+    by_stage: dict[tuple[str, str], list[BenchResult]] = {}
+    for r in results:
+        by_stage.setdefault((r.day, r.stage), []).append(r)
+    for (day, stage), rows in by_stage.items():
+        exponent = scaling_exponent(rows)
+        for r in rows:
+            exp_s = "" if r is not rows[-1] or exponent is None else f"{exponent:.2f}"
+            lines.append(
+                f"{day:>3}  {stage:<20}  {r.scale:>5}  {r.input_bytes:>10}  "
+                f"{r.median:>10.4f}  {r.p95:>10.4f}  {r.throughput / 1e6:>8.2f}  "
+                f"{exp_s:>5}"
+            )
+    return "\n".join(lines)
+
+
+def _test():
+    for timings in ([1.0, 1.1, 1.2, 1.3, 2.0], [1.0, 2.0], [3.0]):
+        median, p95 = summarize_timings(timings)
+        assert min(timings) <= median <= p95 <= max(timings)
+    assert summarize_timings([1.0, 1.1, 1.2, 1.3, 2.0]) == (1.2, 2.0)
+    assert summarize_timings([float(n) for n in range(1, 101)])[1] == 95.0
+
+
+def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Benchmark Advent of Code 2024 days on synthetic inputs"
+    )
+    parser.add_argument(
+        "days", nargs="*", help="Days to benchmark, e.g. 01 6 14 (default: all)"
+    )
+    parser.add_argument(
+        "-s",
+        "--scales",
+        type=int,
+        nargs="+",
+        default=list(DEFAULT_SCALES),
+        help="Input size multipliers relative to the puzzle input (default: 1 10 100)",
+    )
+    parser.add_argument(
+        "-r", "--repeat", type=int, default=5, help="Runs per measurement"
+    )
+    parser.add_argument(
+        "-b",
+        "--budget",
+        type=float,
+        default=10.0,
+        help="Skip larger scales once a stage's median exceeds this many seconds",
+    )
+    parser.add_argument(
+        "--seed", type=int, default=2024, help="Seed for the input generators"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _parse_args(argv)
+    days = [f"{int(d):02d}" for d in args.days] if args.days else discover_days()
+    if unknown := [d for d in days if d not in BENCH_CASES]:
+        print(f"No benchmark for day(s): {', '.join(unknown)}", file=sys.stderr)
+        return 2
+    results: list[BenchResult] = []
+    for day in days:
+        results.extend(
+            bench_day(day, tuple(args.scales), args.repeat, args.budget, args.seed)
+        )
+    print(format_report(results))
+    return 0
+
+
+if __name__ == "__main__":
+    _test()
+    raise SystemExit(main())
@@ -1,9 +1,42 @@
 from __future__ import annotations
 
+import hashlib
+import importlib.util
+import inspect
+import io
+import json
+import mmap
+import operator
+import os
+import re
+import struct
 import sys
-from functools import singledispatchmethod
+import time
+from array import array
+from contextlib import contextmanager, nullcontext
+from functools import cache, wraps
+from itertools import pairwise, repeat
 from pathlib import Path
-from typing import NamedTuple, Sequence, Self, TextIO
+from types import ModuleType
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Final,
+    Iterable,
+    Iterator,
+    NamedTuple,
+    Sequence,
+    Self,
+    TextIO,
+    TypeVar,
+)
+
+if TYPE_CHECKING:
+    Buffer = bytes | bytearray | mmap.mmap
+
+T = TypeVar("T")
+
+DAYS_DIR = Path(__file__).parent
 
 
 class Point(NamedTuple):
@@ -44,24 +77,653 @@ class Point(NamedTuple):
         """Calculate delta (signed shift) needed to translate to another Point. The values will be directional"""
         return Point(other.x - self.x, other.y - self.y)
 
-    @singledispatchmethod
-    def within(self, arg, *_):
+    def within(self, arg, *args, **kwargs) -> bool:
+        """
+        Either within(ubound_x, ubound_y, lbound_x=0, lbound_y=0), with exclusive upper
+        bounds, or within(corner1, corner2, inclusive_max=False)
+        """
+        # Plain type checks rather than singledispatch: this gets called in hot loops
+        if isinstance(arg, int):
+            return self._within_bounds(arg, *args, **kwargs)
+        if isinstance(arg, Point):
+            return self._within_corners(arg, *args, **kwargs)
         raise NotImplementedError(f"within() not defined for type {type(arg)}")
 
-    @within.register
-    def _(self, ubound_x: int, ubound_y: int, lbound_x: int = 0, lbound_y: int = 0):
+    def _within_bounds(
+        self, ubound_x: int, ubound_y: int, lbound_x: int = 0, lbound_y: int = 0
+    ):
         return (lbound_x <= self.x < ubound_x) and (lbound_y <= self.y < ubound_y)
 
+    def _within_corners(self, corner1: Point, corner2: Point, inclusive_max=False):
+        return Bounds.from_corners(corner1, corner2, inclusive_max).contains(*self)
+
+
+class Bounds:
+    """
+    The half-open rectangle xmin <= x < xmax, ymin <= y < ymax.
+
+    Besides bounds checks, a Bounds can pack a coordinate inside it into a single int,
+    (y - ymin) * width + (x - xmin), which is cheaper to hash and store than a Point.
+    """
+
+    __slots__ = ("xmin", "ymin", "xmax", "ymax", "width", "height")
+
+    def __init__(self, xmax: int, ymax: int, xmin: int = 0, ymin: int = 0):
+        self.xmin = xmin
+        self.ymin = ymin
+        self.xmax = xmax
+        self.ymax = ymax
+        self.width = xmax - xmin
+        self.height = ymax - ymin
+
+    @classmethod
+    def from_corners(
+        cls, corner1: Point, corner2: Point, inclusive_max: bool = False
+    ) -> Bounds:
+        return cls(
+            max(corner1.x, corner2.x) + inclusive_max,
+            max(corner1.y, corner2.y) + inclusive_max,
+            min(corner1.x, corner2.x),
+            min(corner1.y, corner2.y),
+        )
+
+    def __repr__(self):
+        return f"Bounds({self.xmax}, {self.ymax}, {self.xmin}, {self.ymin})"
+
+    def __len__(self):
+        return self.width * self.height
+
+    def contains(self, x: int, y: int) -> bool:
+        return self.xmin <= x < self.xmax and self.ymin <= y < self.ymax
+
+    def __contains__(self, point: tuple[int, int]) -> bool:
+        x, y = point
+        return self.xmin <= x < self.xmax and self.ymin <= y < self.ymax
+
+    def contains_many(self, points: Iterable[tuple[int, int]]) -> list[bool]:
+        xmin, ymin, xmax, ymax = self.xmin, self.ymin, self.xmax, self.ymax
+        return [xmin <= x < xmax and ymin <= y < ymax for x, y in points]
+
+    def pack(self, x: int, y: int) -> int:
+        """Packed code of (x, y), which must lie within the bounds"""
+        return (y - self.ymin) * self.width + (x - self.xmin)
+
+    def unpack(self, code: int) -> Point:
+        y, x = divmod(code, self.width)
+        return Point(x + self.xmin, y + self.ymin)
+
+
+class PointArray:
+    """
+    A batch of Points stored as two int64 columns. Supports the same arithmetic as
+    Point, applied to every point at once; the right operand can be another PointArray
+    of the same length (elementwise) or a single Point (broadcast).
+    """
+
+    __slots__ = ("x", "y")
+
+    def __init__(self, x: Iterable[int] = (), y: Iterable[int] = ()):
+        self.x = x if isinstance(x, array) else array("q", x)
+        self.y = y if isinstance(y, array) else array("q", y)
+        if len(self.x) != len(self.y):
+            raise ValueError("x and y columns must have the same length")
+
+    @classmethod
+    def from_points(cls, points: Iterable[tuple[int, int]]) -> PointArray:
+        xs = array("q")
+        ys = array("q")
+        for x, y in points:
+            xs.append(x)
+            ys.append(y)
+        return cls(xs, ys)
+
+    def to_points(self) -> list[Point]:
+        return list(map(Point, self.x, self.y))
+
+    def pairs(self) -> Iterator[tuple[int, int]]:
+        """Iterate as plain (x, y) tuples, which hash and compare equal to Points"""
+        return zip(self.x, self.y)
+
+    def __len__(self):
+        return len(self.x)
+
+    def __iter__(self) -> Iterator[Point]:
+        return map(Point, self.x, self.y)
+
+    def __getitem__(self, idx: int) -> Point:
+        return Point(self.x[idx], self.y[idx])
+
+    def __eq__(self, other):
+        if not isinstance(other, PointArray):
+            return NotImplemented
+        return self.x == other.x and self.y == other.y
+
+    def __repr__(self):
+        return f"PointArray({self.to_points()!r})"
+
+    def _zip_with(self, func, other: PointArray | Point) -> PointArray:
+        if isinstance(other, PointArray):
+            if len(other) != len(self):
+                raise ValueError("PointArray lengths differ")
+            return PointArray(
+                array("q", map(func, self.x, other.x)),
+                array("q", map(func, self.y, other.y)),
+            )
+        ox, oy = other
+        return PointArray(
+            array("q", map(func, self.x, repeat(ox))),
+            array("q", map(func, self.y, repeat(oy))),
+        )
+
+    def __neg__(self) -> PointArray:
+        return PointArray(
+            array("q", map(operator.neg, self.x)), array("q", map(operator.neg, self.y))
+        )
+
+    def __add__(self, other: PointArray | Point) -> PointArray:
+        return self._zip_with(operator.add, other)
 
-# noinspection PyUnresolvedReferences
-@Point.within.register
-def _(self, corner1: Point, corner2: Point, inclusive_max: bool = False):
-    xmin = min(corner1.x, corner2.x)
-    xmax = max(corner1.x, corner2.x) + inclusive_max
-    ymin = min(corner1.y, corner2.y)
-    ymax = max(corner1.y, corner2.y) + inclusive_max
-    return self.within(xmax, ymax, xmin, ymin)
+    def __sub__(self, other: PointArray | Point) -> PointArray:
+        return self._zip_with(operator.sub, other)
+
+    def __mul__(self, other: int) -> PointArray:
+        return PointArray(
+            array("q", map(operator.mul, self.x, repeat(other))),
+            array("q", map(operator.mul, self.y, repeat(other))),
+        )
+
+    def __mod__(self, other: Point) -> PointArray:
+        return self._zip_with(operator.mod, other)
+
+    def __matmul__(self, matrix: Sequence[Sequence[str | None]]) -> list[str | None]:
+        return [Point(x, y) @ matrix for x, y in zip(self.x, self.y)]
+
+    def within(
+        self, ubound_x: int, ubound_y: int, lbound_x: int = 0, lbound_y: int = 0
+    ) -> list[bool]:
+        """Per-point result of Point.within() for the given bounds"""
+        return [
+            lbound_x <= x < ubound_x and lbound_y <= y < ubound_y
+            for x, y in zip(self.x, self.y)
+        ]
+
+
+RE_INT: Final[re.Pattern] = re.compile(rb"-?\d+")
+
+
+def puzzle_input_path() -> Path:
+    return Path(sys.argv[0]).with_suffix(".txt")
 
 
 def open_puzzle_input() -> TextIO:
-    return open(Path(sys.argv[0]).with_suffix(".txt"))
+    return open(puzzle_input_path())
+
+
+@contextmanager
+def map_puzzle_input(path: Path | None = None) -> Iterator[Buffer]:
+    """
+    Memory-map the puzzle input read-only, without decoding it. Views obtained from the
+    map (e.g. through iter_line_views()) must be released before the context exits.
+    """
+    with open(path or puzzle_input_path(), "rb") as fin:
+        # mmap refuses to map an empty file
+        if not os.fstat(fin.fileno()).st_size:
+            yield b""
+            return
+        with mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield mm
+
+
+def _line_spans(buf: Buffer) -> Iterator[tuple[int, int]]:
+    start = 0
+    size = len(buf)
+    while start < size:
+        if (end := buf.find(b"\n", start)) == -1:
+            end = size
+        yield start, end
+        start = end + 1
+
+
+def iter_lines(buf: Buffer) -> Iterator[bytes]:
+    """Lines of buf as bytes, without the line terminator. Only each line gets copied"""
+    for start, end in _line_spans(buf):
+        yield buf[start:end]
+
+
+def iter_line_views(buf: Buffer) -> Iterator[memoryview]:
+    """Zero-copy version of iter_lines(), yielding memoryview slices of buf"""
+    view = memoryview(buf)
+    try:
+        for start, end in _line_spans(buf):
+            yield view[start:end]
+    finally:
+        view.release()
+
+
+def iter_chunks(buf: Buffer, chunk_size: int = 1 << 20) -> Iterator[memoryview]:
+    """
+    Zero-copy slices of buf of about chunk_size bytes, each ending right after a line
+    terminator (or at the end of buf). A line longer than chunk_size gets its own chunk.
+    """
+    view = memoryview(buf)
+    size = len(buf)
+    start = 0
+    try:
+        while start < size:
+            end = min(start + chunk_size, size)
+            if end < size:
+                if (nl := buf.rfind(b"\n", start, end)) == -1:
+                    nl = buf.find(b"\n", end)
+                end = size if nl == -1 else nl + 1
+            yield view[start:end]
+            start = end
+    finally:
+        view.release()
+
+
+def parse_ints(data: str | Buffer) -> list[int]:
+    """All (possibly negative) integers in data, in order"""
+    if isinstance(data, str):
+        data = data.encode()
+    return list(map(int, RE_INT.findall(data)))
+
+
+@cache
+def _bytes_pattern(pattern: re.Pattern) -> re.Pattern:
+    return re.compile(pattern.pattern.encode(), pattern.flags & ~re.UNICODE)
+
+
+def pattern_for(pattern: re.Pattern, data: str | Buffer) -> re.Pattern:
+    """Return pattern, or its bytes twin if data is bytes-like, so it can match data"""
+    if isinstance(data, str) or isinstance(pattern.pattern, bytes):
+        return pattern
+    return _bytes_pattern(pattern)
+
+
+def discover_days() -> list[str]:
+    """Return the names (e.g. "01") of all day scripts living next to this module"""
+    return sorted(p.stem for p in DAYS_DIR.glob("[0-9][0-9].py"))
+
+
+def day_script(day: str | int) -> Path:
+    return DAYS_DIR / f"{int(day):02d}.py"
+
+
+def load_day(day: str | int) -> ModuleType:
+    """
+    Import a day script as a module. The scripts' names are not valid identifiers, so
+    they are loaded by path and registered as "aoc2024_dayNN" so that their functions
+    can be pickled into worker processes. That relies on the fork start method (the
+    Linux default): a spawned child starts afresh, and cannot import those names.
+    """
+    path = day_script(day)
+    name = f"aoc2024_day{path.stem}"
+    if (module := sys.modules.get(name)) is not None:
+        return module
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[name]
+        raise
+    return module
+
+
+WORKERS_ENV: Final[str] = "AOC2024_WORKERS"
+
+
+def default_workers() -> int:
+    """
+    Worker processes a day may start for itself: $AOC2024_WORKERS if set, otherwise
+    the CPU count. The runner sets it so that days running side by side share the CPUs.
+    """
+    if workers := os.environ.get(WORKERS_ENV):
+        return max(1, int(workers))
+    return os.cpu_count() or 1
+
+
+class Grid:
+    """
+    A rectangular grid of single-byte cells, stored row-major in one flat bytearray.
+
+    The grid is surrounded by `pad` rows/columns of `fill`, so that stepping up to `pad`
+    cells off any edge lands on a fill cell instead of needing a bounds check. Cells are
+    addressed by flat index; use index() / coords() to convert from / to (x, y).
+    """
+
+    __slots__ = ("width", "height", "pad", "fill", "stride", "data", "dirs4", "dirs8")
+
+    def __init__(self, width: int, height: int, pad: int = 1, fill: int = 0):
+        self.width = width
+        self.height = height
+        self.pad = pad
+        self.fill = fill
+        self.stride = width + 2 * pad
+        self.data = bytearray([fill]) * (self.stride * (height + 2 * pad))
+        s = self.stride
+        # Flat offsets of the neighbours, in the same order as the DIRS of the days:
+        # right, down, left, up; then the diagonals
+        self.dirs4: tuple[int, ...] = (1, s, -1, -s)
+        self.dirs8: tuple[int, ...] = self.dirs4 + (s + 1, s - 1, -s - 1, -s + 1)
+
+    @classmethod
+    def from_lines(
+        cls, lines: Iterable[str | bytes], pad: int = 1, fill: int = 0
+    ) -> Grid:
+        rows = [ln.encode() if isinstance(ln, str) else bytes(ln) for ln in lines]
+        grid = cls(max(map(len, rows), default=0), len(rows), pad, fill)
+        for y, row in enumerate(rows):
+            start = grid.index(0, y)
+            grid.data[start : start + len(row)] = row
+        return grid
+
+    def index(self, x: int, y: int) -> int:
+        return (y + self.pad) * self.stride + x + self.pad
+
+    def coords(self, idx: int) -> tuple[int, int]:
+        y, x = divmod(idx, self.stride)
+        return x - self.pad, y - self.pad
+
+    def point(self, idx: int) -> Point:
+        return Point(*self.coords(idx))
+
+    def __getitem__(self, idx: int) -> int:
+        return self.data[idx]
+
+    def __setitem__(self, idx: int, value: int):
+        self.data[idx] = value
+
+    def at(self, x: int, y: int) -> int:
+        return self.data[self.index(x, y)]
+
+    def cells(self) -> Iterator[int]:
+        """Flat indices of all cells inside the grid, row by row"""
+        for y in range(self.height):
+            start = self.index(0, y)
+            yield from range(start, start + self.width)
+
+    def find_all(self, value: int) -> Iterator[int]:
+        """Flat indices of all cells holding value. Fill cells are never reported"""
+        data = self.data
+        needle = bytes([value])
+        for y in range(self.height):
+            start = self.index(0, y)
+            end = start + self.width
+            while (idx := data.find(needle, start, end)) != -1:
+                yield idx
+                start = idx + 1
+
+    def row(self, y: int) -> bytes:
+        start = self.index(0, y)
+        return bytes(self.data[start : start + self.width])
+
+    def column(self, x: int) -> bytes:
+        start = self.index(x, 0)
+        return bytes(self.data[start : start + self.height * self.stride : self.stride])
+
+    def scan_lines(self) -> Iterator[tuple[int, int, bytes]]:
+        """
+        Yield (start index, flat step, cells) for every row, column, diagonal (going
+        down-right) and anti-diagonal (going down-left) of the grid
+        """
+        w, h, s = self.width, self.height, self.stride
+        for y in range(h):
+            yield self.index(0, y), 1, self.row(y)
+        for x in range(w):
+            yield self.index(x, 0), s, self.column(x)
+        starts = [(x, 0) for x in range(w)] + [(0, y) for y in range(1, h)]
+        for x, y in starts:
+            length = min(w - x, h - y)
+            start = self.index(x, y)
+            step = s + 1
+            yield start, step, bytes(self.data[start : start + length * step : step])
+        starts = [(x, 0) for x in range(w)] + [(w - 1, y) for y in range(1, h)]
+        for x, y in starts:
+            length = min(x + 1, h - y)
+            start = self.index(x, y)
+            step = s - 1
+            yield start, step, bytes(self.data[start : start + length * step : step])
+
+
+# region Stage timing
+
+_timing_sink: TextIO | None = None
+_timing_owned: bool = False
+_NULL_TIMER: Final = nullcontext()
+
+
+def enable_timing(target: str | Path | TextIO | None = "-"):
+    """
+    Start emitting one JSON line per timed() stage to target: "-" for stderr, a path to
+    append to, or an open text stream. None disables timing again.
+    """
+    global _timing_sink, _timing_owned
+    if _timing_owned:
+        _timing_sink.close()
+    _timing_owned = False
+    if target is None or isinstance(target, io.TextIOBase):
+        _timing_sink = target
+    elif str(target) == "-":
+        _timing_sink = sys.stderr
+    else:
+        _timing_sink = open(target, "a", buffering=1)
+        _timing_owned = True
+
+
+def timing_enabled() -> bool:
+    return _timing_sink is not None
+
+
+def _children_cpu() -> float:
+    times = os.times()
+    return times.children_user + times.children_system
+
+
+class _StageTimer:
+    __slots__ = ("day", "stage", "_sink", "_wall", "_cpu", "_children_cpu")
+
+    def __init__(self, stage: str, day: str):
+        self.day = day
+        self.stage = stage
+
+    def __enter__(self):
+        # The stage reports where timing pointed when it started, even if that changes
+        self._sink = _timing_sink
+        self._children_cpu = _children_cpu()
+        self._cpu = time.process_time()
+        self._wall = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        wall = time.perf_counter() - self._wall
+        cpu = time.process_time() - self._cpu
+        cpu += _children_cpu() - self._children_cpu
+        if self._sink is None or self._sink.closed:
+            return False
+        record = {
+            "day": self.day,
+            "stage": self.stage,
+            "wall": wall,
+            "cpu": cpu,
+            "ok": exc_type is None,
+            "ts": time.time(),
+        }
+        self._sink.write(json.dumps(record) + "\n")
+        return False
+
+
+def timed(stage: str, day: str | None = None):
+    """
+    Context manager recording the wall and CPU time of one stage ("parse", "part1",
+    "part2", ...) of a day. The CPU time includes child processes that finish within
+    the stage, such as the workers of a pool shut down inside it. The day defaults to
+    the running script's name. When timing is not enabled this returns a shared no-op
+    context, so it costs next to nothing.
+    """
+    if _timing_sink is None:
+        return _NULL_TIMER
+    return _StageTimer(stage, day or Path(sys.argv[0]).stem)
+
+
+def timed_stage(stage: str, day: str | None = None):
+    """Decorator version of timed()"""
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if _timing_sink is None:
+                return func(*args, **kwargs)
+            with timed(stage, day):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+if _target := os.environ.get("AOC2024_TIMING"):
+    enable_timing(_target)
+
+# endregion
+
+CACHE_DIR: Final[Path] = DAYS_DIR / ".aoc_cache"
+_CACHE_MAGIC: Final[bytes] = b"AOC2024C\x01"
+_CACHE_HEADER: Final[struct.Struct] = struct.Struct("<H c Q")
+
+
+def save_arrays(path: Path, arrays: dict[str, array]):
+    """Write named arrays to path as raw machine values, replacing it atomically"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as fout:
+        fout.write(_CACHE_MAGIC)
+        for name, arr in arrays.items():
+            bname = name.encode()
+            fout.write(_CACHE_HEADER.pack(len(bname), arr.typecode.encode(), len(arr)))
+            fout.write(bname)
+            arr.tofile(fout)
+    os.replace(tmp, path)
+
+
+def load_arrays(path: Path) -> dict[str, array]:
+    arrays: dict[str, array] = {}
+    with open(path, "rb") as fin:
+        if fin.read(len(_CACHE_MAGIC)) != _CACHE_MAGIC:
+            raise ValueError(f"{path} is not a parsed-input cache file")
+        while header := fin.read(_CACHE_HEADER.size):
+            name_len, typecode, count = _CACHE_HEADER.unpack(header)
+            name = fin.read(name_len).decode()
+            arr = array(typecode.decode())
+            arr.fromfile(fin, count)
+            arrays[name] = arr
+    return arrays
+
+
+def pack_ragged(rows: Iterable[Iterable[int]]) -> tuple[array, array]:
+    """Flatten rows of ints; row i becomes values[offsets[i] : offsets[i + 1]]"""
+    values = array("q")
+    offsets = array("q", [0])
+    for row in rows:
+        values.extend(row)
+        offsets.append(len(values))
+    return values, offsets
+
+
+def unpack_ragged(values: array, offsets: array) -> list[list[int]]:
+    return [values[a:b].tolist() for a, b in pairwise(offsets)]
+
+
+def cached_consume(
+    consume: Callable[[Iterable], T],
+    pack: Callable[[T], dict[str, array]],
+    unpack: Callable[[dict[str, array]], T],
+    path: Path | None = None,
+) -> T:
+    """
+    consume() the puzzle input, reusing the result of an earlier run if neither the
+    input nor the source of the modules defining consume/pack/unpack (or this one,
+    for the parsing helpers) have changed since. Parsed data is stored through pack()
+    as plain arrays rather than pickled.
+    """
+    path = path or puzzle_input_path()
+    with open(path, "rb") as fin:
+        input_hash = hashlib.file_digest(fin, "sha256").hexdigest()
+    # Whole modules, so that patterns and helpers the functions use are covered too
+    modules = dict.fromkeys(
+        [inspect.getmodule(func) or func for func in (consume, pack, unpack)]
+        + [sys.modules[__name__]]
+    )
+    source = "".join(inspect.getsource(module) for module in modules)
+    source_hash = hashlib.sha256(source.encode()).hexdigest()
+    cache_file = CACHE_DIR / f"{path.stem}-{input_hash[:16]}-{source_hash[:16]}.bin"
+    if cache_file.exists():
+        try:
+            return unpack(load_arrays(cache_file))
+        except (ValueError, EOFError, struct.error, KeyError):
+            # Damaged or truncated; parse again and overwrite it below
+            pass
+
+    with map_puzzle_input(path) as buf:
+        data = consume(iter_lines(buf))
+    try:
+        save_arrays(cache_file, pack(data))
+    except OverflowError:
+        # Values too large for machine integers; just don't cache
+        pass
+    return data
+
+
+def _test():
+    p = Point(3, 4)
+    assert p.within(4, 5) and not p.within(3, 5) and not p.within(4, 5, 4)
+    # Corners in either order; the max corner is excluded unless inclusive_max
+    assert p.within(Point(1, 1), Point(4, 5))
+    assert p.within(Point(4, 5), Point(1, 1))
+    assert p.within(Point(4, 1), Point(1, 5))
+    assert not p.within(Point(1, 1), Point(3, 4))
+    assert p.within(Point(1, 1), Point(3, 4), inclusive_max=True)
+    assert p.within(Point(3, 4), Point(1, 1), True)
+    assert not p.within(Point(4, 5), Point(5, 6), True)
+
+    bounds = Bounds.from_corners(Point(7, -2), Point(-3, 5), inclusive_max=True)
+    assert (bounds.xmin, bounds.ymin, bounds.xmax, bounds.ymax) == (-3, -2, 8, 6)
+    assert len(bounds) == bounds.width * bounds.height == 11 * 8
+    points = [(-3, -2), (7, 5), (8, 5), (7, 6), (-4, 0), (0, 0)]
+    assert bounds.contains_many(points) == [True, True, False, False, False, True]
+    assert [pt in bounds for pt in points] == bounds.contains_many(points)
+    assert [bounds.contains(*pt) for pt in points] == bounds.contains_many(points)
+    codes = [bounds.pack(x, y) for y in range(-2, 6) for x in range(-3, 8)]
+    assert codes == list(range(len(bounds)))
+    for x, y in points[:2] + points[-1:]:
+        assert bounds.unpack(bounds.pack(x, y)) == Point(x, y)
+
+    data = b"1 -2\n30 4\n\n-5 66"
+    # Chunks end right after a newline, or at the end of data without one
+    for chunk_size in range(1, len(data) + 2):
+        chunks = [bytes(c) for c in iter_chunks(data, chunk_size)]
+        assert b"".join(chunks) == data, chunk_size
+        assert all(c.endswith(b"\n") for c in chunks[:-1]), chunk_size
+    assert [bytes(c) for c in iter_chunks(data, 5)] == [
+        b"1 -2\n",
+        b"30 4\n",
+        b"\n",
+        b"-5 66",
+    ]
+    # A line longer than chunk_size makes a chunk of its own
+    assert [bytes(c) for c in iter_chunks(b"12345678\n9\n", 3)] == [
+        b"12345678\n",
+        b"9\n",
+    ]
+    assert [bytes(v) for v in iter_line_views(data)] == list(iter_lines(data))
+    assert list(iter_lines(data)) == [b"1 -2", b"30 4", b"", b"-5 66"]
+    assert list(iter_lines(data + b"\n")) == list(iter_lines(data))
+    assert parse_ints(data) == [1, -2, 30, 4, -5, 66]
+    assert parse_ints("x=-7,y=+8 9-3") == [-7, 8, 9, -3]
+    assert parse_ints(memoryview(data)[5:]) == [30, 4, -5, 66]
+    print("aoc2024_common self-test passed")
+
+
+if __name__ == "__main__":
+    _test()